@@ -0,0 +1,543 @@
+from contextlib import contextmanager, nullcontext
+import json
+import os
+import threading
+import time
+
+import diagnostico
+import fotografia
+
+try:
+    import fcntl  # Linux e macOS
+except ImportError:
+    fcntl = None
+    import msvcrt  # Windows
+
+# Função que trava um arquivo aberto com exclusividade; retorna False se `bloquear` for False e ele já estiver travado
+def _travar(f, bloquear=True):
+    if fcntl is not None:
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | (0 if bloquear else fcntl.LOCK_NB))
+        except BlockingIOError:
+            return False
+        return True
+    while True:
+        try:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            if not bloquear:
+                return False
+            time.sleep(0.01)
+
+# Função que libera a trava de um arquivo
+def _destravar(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+# Classe que representa uma trava entre processos, feita sobre um arquivo auxiliar
+# Cada aquisição abre o arquivo de novo, então duas travas do mesmo arquivo também se excluem dentro de um processo
+class TravaArquivo:
+    def __init__(self, arquivo):
+        self.arquivo = arquivo  # Caminho do arquivo usado como trava
+        self._f = None  # Arquivo aberto enquanto a trava está adquirida
+
+    # Método para adquirir a trava; retorna False se `bloquear` for False e outro já a tiver
+    def adquirir(self, bloquear=True):
+        f = open(self.arquivo, "a+b")
+        if not _travar(f, bloquear):
+            f.close()
+            return False
+        self._f = f
+        return True
+
+    # Método para liberar a trava (pode ser chamado por outra thread)
+    def liberar(self):
+        f, self._f = self._f, None
+        _destravar(f)
+        f.close()
+
+# Classe que representa o diário (journal) de eventos, gravado apenas por acréscimo
+class Diario:
+    def __init__(self, arquivo, lote_fsync=32, intervalo_fsync=0.05):
+        self.arquivo = arquivo  # Caminho do arquivo do diário
+        self.lote_fsync = lote_fsync  # Quantidade de eventos pendentes que força um fsync
+        self.intervalo_fsync = intervalo_fsync  # Tempo máximo (s) que um evento espera pelo fsync
+        self.eventos = 0  # Quantidade de registros alterados desde a última compactação (um lote conta cada registro)
+        self._pendentes = 0  # Eventos gravados e ainda não sincronizados com o disco
+        self._ultimo_fsync = time.monotonic()  # Momento do último fsync
+        self._temporizador = None  # Timer que sincroniza os eventos pendentes de um lote
+        self._lock = threading.Lock()  # Protege o arquivo entre a thread principal e o timer
+        self._descartar_linha_incompleta()
+        # Em modo binário: nada converte \n em \r\n (Windows) e os bytes gravados são exatamente os contados em registrar
+        self._arquivo = open(arquivo, "ab")
+        self.identidade = identidade(os.fstat(self._arquivo.fileno()))  # Outro processo pode trocar o arquivo ao compactar
+
+    # Método para cortar uma última linha incompleta, para que os próximos eventos não fiquem grudados nela
+    def _descartar_linha_incompleta(self):
+        try:
+            with open(self.arquivo, "rb+") as f:
+                f.seek(0, os.SEEK_END)
+                tamanho = f.tell()
+                # Volta em blocos até encontrar a última quebra de linha
+                fim = tamanho
+                while fim > 0:
+                    inicio = max(0, fim - 4096)
+                    f.seek(inicio)
+                    bloco = f.read(fim - inicio)
+                    posicao = bloco.rfind(b"\n")
+                    if posicao != -1:
+                        fim = inicio + posicao + 1
+                        break
+                    fim = inicio
+                if fim != tamanho:
+                    f.truncate(fim)
+        except FileNotFoundError:
+            pass
+
+    # Método para acrescentar um evento ao final do diário; retorna quantos bytes foram gravados
+    def registrar(self, evento):
+        linha = (json.dumps(evento, separators=(",", ":")) + "\n").encode("utf-8")  # Uma linha compacta (e só ASCII) por evento
+        with self._lock:
+            self._arquivo.write(linha)
+            self._arquivo.flush()  # Entrega ao sistema operacional: sobrevive a uma queda do processo
+            self.eventos += peso(evento)
+            self._pendentes += 1
+            # Agrupa os fsyncs: só sincroniza quando o lote enche ou o intervalo estoura
+            if self._pendentes >= self.lote_fsync or time.monotonic() - self._ultimo_fsync >= self.intervalo_fsync:
+                self._sincronizar_disco()
+            elif self._temporizador is None:
+                self._temporizador = threading.Timer(self.intervalo_fsync, self.sincronizar_disco)
+                self._temporizador.daemon = True
+                self._temporizador.start()
+        diagnostico.contar("bytes gravados", len(linha))
+        return len(linha)
+
+    # Método para garantir que todos os eventos gravados estão no disco
+    def sincronizar_disco(self):
+        with self._lock:
+            self._sincronizar_disco()
+
+    def _sincronizar_disco(self):
+        if self._pendentes and not self._arquivo.closed:
+            os.fsync(self._arquivo.fileno())
+            diagnostico.contar("fsyncs")
+        self._pendentes = 0
+        self._ultimo_fsync = time.monotonic()
+        if self._temporizador is not None:
+            self._temporizador.cancel()
+            self._temporizador = None
+
+    # Método para fechar o diário, sincronizando o que estiver pendente
+    def fechar(self):
+        with self._lock:
+            self._sincronizar_disco()
+            self._arquivo.close()
+
+    # Método para ler os eventos de um arquivo de diário já aberto em modo binário
+    # A última linha sem quebra ainda está sendo gravada (ou foi cortada por uma queda) e não é lida
+    @staticmethod
+    def ler_arquivo(f):
+        for linha in f:
+            if not linha.endswith(b"\n"):
+                return
+            evento = interpretar_linha(linha)
+            if evento is not None:
+                yield evento
+
+    # Método para ler os eventos de um arquivo de diário
+    @staticmethod
+    def ler(arquivo):
+        try:
+            with open(arquivo, "rb") as f:
+                yield from Diario.ler_arquivo(f)
+        except FileNotFoundError:
+            return
+
+    # Método para ler os eventos completos gravados a partir de `posicao` (em bytes)
+    # Retorna (eventos, nova posição), ou None se o arquivo não existir ou não for mais o de `identidade_esperada`
+    # Linhas corrompidas são tratadas como em ler_arquivo: os dois leitores sempre aplicam os mesmos eventos
+    @staticmethod
+    def ler_desde(arquivo, posicao, identidade_esperada=None):
+        try:
+            f = open(arquivo, "rb")
+        except FileNotFoundError:
+            return None
+        with f:
+            if identidade_esperada is not None and identidade(os.fstat(f.fileno())) != identidade_esperada:
+                return None
+            f.seek(posicao)
+            dados = f.read()
+        diagnostico.contar("bytes lidos", len(dados))
+        eventos = []
+        fim = dados.rfind(b"\n") + 1  # Uma linha ainda sem quebra está sendo gravada por outro processo
+        for linha in dados[:fim].splitlines():
+            evento = interpretar_linha(linha)
+            if evento is not None:
+                eventos.append(evento)
+        return eventos, posicao + fim
+
+# Função que interpreta uma linha completa do diário; retorna o evento, ou None se nada puder ser aproveitado
+# Um processo interrompido no meio de uma gravação deixa o começo de um evento sem quebra de linha, e o próximo
+# evento acrescentado por outro processo fica grudado nele: esse evento é recuperado a partir do seu início
+# ({"tipo":...) e o resto da linha é descartado, como as linhas cortadas do histórico (historico.ler_particao)
+def interpretar_linha(linha):
+    try:
+        return json.loads(linha)
+    except json.JSONDecodeError:
+        pass
+    diagnostico.contar("linhas corrompidas no diário")
+    inicio = linha.find(b'{"tipo":', 1)
+    while inicio != -1:
+        try:
+            return json.loads(linha[inicio:])
+        except json.JSONDecodeError:
+            inicio = linha.find(b'{"tipo":', inicio + 1)
+    return None
+
+# Função que identifica um arquivo pelo seu inode (muda quando o arquivo é substituído por outro)
+def identidade(info):
+    return (info.st_dev, info.st_ino)
+
+# Função que indica quantos registros um evento altera (usada para decidir quando compactar)
+def peso(evento):
+    return len(evento["registros"]) if "registros" in evento else 1
+
+# Função que aplica um evento do diário sobre os dados indexados por chave
+# Os eventos guardam valores absolutos, então aplicar o mesmo evento duas vezes não altera o resultado
+def aplicar_evento(estado, evento):
+    tipo = evento["tipo"]
+    if tipo == "livro":
+        registro = evento["registro"]
+        estado["livros"][registro["id_exemplar"]] = registro
+    elif tipo == "livros":
+        for registro in evento["registros"]:
+            estado["livros"][registro["id_exemplar"]] = registro
+    elif tipo == "usuario":
+        registro = evento["registro"]
+        estado["usuarios"].setdefault(registro["email"], registro)
+    elif tipo == "usuarios":
+        for registro in evento["registros"]:
+            estado["usuarios"].setdefault(registro["email"], registro)
+    elif tipo == "emprestimo":
+        id_exemplar = evento["id_exemplar"]
+        livro = estado["livros"].get(id_exemplar)
+        if livro:
+            livro["emprestado"] = True
+            livro["emprestimos_count"] = evento["emprestimos_count"]
+        estado["emprestimos"].pop(id_exemplar, None)  # Reinsere no fim, como um append na lista
+        estado["emprestimos"][id_exemplar] = {
+            "id_exemplar": id_exemplar,
+            "usuario_email": evento["usuario_email"],
+            "data_emprestimo": evento["data_emprestimo"],
+        }
+    elif tipo == "devolucao":
+        id_exemplar = evento["id_exemplar"]
+        livro = estado["livros"].get(id_exemplar)
+        if livro:
+            livro["emprestado"] = False
+        estado["emprestimos"].pop(id_exemplar, None)
+
+# Exceção para um evento que não pode ser aplicado porque os dados gravados mudaram (ex.: livro já emprestado)
+class ConflitoArmazenamento(Exception):
+    pass
+
+# Classe base das formas de persistência usadas pela Biblioteca
+# Toda alteração chega como um evento (ver aplicar_evento); cada implementação decide como gravá-lo
+class Armazenamento:
+    _trava = None  # TravaArquivo que serializa as gravações entre processos (None: sem trava)
+    diretorio = "."  # Pasta dos dados; outros arquivos da biblioteca (ex.: o histórico) ficam junto deles
+
+    # Método para iniciar a trava entre processos feita sobre o arquivo informado
+    def _iniciar_trava(self, arquivo):
+        self._trava = TravaArquivo(arquivo)
+        self._trava_threads = threading.RLock()  # A trava de arquivo não distingue threads do mesmo objeto
+        self._niveis_trava = 0  # Quantas vezes a trava foi adquirida sem ser liberada (é reentrante)
+
+    # Método para obter exclusividade de gravação entre processos (usado com `with`)
+    # Dentro dele, o que for lido com alterados/novos_eventos não muda até a gravação terminar
+    @contextmanager
+    def bloquear(self):
+        if self._trava is None:
+            yield
+            return
+        with self._trava_threads:
+            if self._niveis_trava == 0:
+                self._trava.adquirir()
+            self._niveis_trava += 1
+            try:
+                yield
+            finally:
+                self._niveis_trava -= 1
+                if self._niveis_trava == 0:
+                    self._trava.liberar()
+
+    # Método para listar as coleções que mudaram por fora desde a última leitura
+    # Uma lista não vazia pede uma releitura completa com carregar_estado
+    def alterados(self):
+        raise NotImplementedError
+
+    # Método para carregar o estado completo: {"livros": [...], "usuarios": [...], "emprestimos": [...]}
+    def carregar_estado(self):
+        raise NotImplementedError
+
+    # Método para obter os eventos gravados por outros processos desde a última leitura
+    # Retorna None quando só uma releitura completa resolve
+    def novos_eventos(self):
+        return []
+
+    # Método para gravar um evento; lança ConflitoArmazenamento se ele não puder ser aplicado
+    def registrar(self, evento):
+        raise NotImplementedError
+
+    # Verifica se o armazenamento quer receber o estado completo para compactar
+    def precisa_compactar(self):
+        return False
+
+    # Método para compactar o armazenamento a partir do estado completo
+    def compactar(self, estado):
+        pass
+
+    # Método para fechar o armazenamento
+    def fechar(self):
+        pass
+
+# Classe responsável por ler e gravar os dados da biblioteca nos arquivos JSON
+# Os arquivos .txt são fotografias (snapshots); as alterações vão para o diário e são compactadas em segundo plano
+# Vários processos podem usar os mesmos arquivos: as gravações acontecem com a trava (diario.txt.trava) adquirida,
+# e cada processo lê do diário os eventos que os outros acrescentaram
+class ArmazenamentoJSON(Armazenamento):
+    # Chave que identifica cada registro de uma coleção
+    _chaves = {"livros": "id_exemplar", "usuarios": "email", "emprestimos": "id_exemplar"}
+
+    def __init__(self, livros_arquivo="livros.txt", usuarios_arquivo="usuarios.txt", emprestimos_arquivo="emprestimos.txt",
+                 diario_arquivo="diario.txt", limite_compactacao=1000, fracao_compactacao=0.25):
+        # Associa o nome de cada coleção ao arquivo onde ela é guardada
+        self.arquivos = {
+            "livros": livros_arquivo,
+            "usuarios": usuarios_arquivo,
+            "emprestimos": emprestimos_arquivo,
+        }
+        self.diario_arquivo = diario_arquivo  # Caminho do diário de eventos
+        self.diretorio = os.path.dirname(os.path.abspath(diario_arquivo))  # Pasta dos dados
+        self.compactando_arquivo = diario_arquivo + ".compactando"  # Diário sendo incorporado às fotografias
+        self.limite_compactacao = limite_compactacao  # Quantidade mínima de eventos para compactar
+        self.fracao_compactacao = fracao_compactacao  # Tamanho mínimo do diário, em fração do tamanho das fotografias
+        self.diario = None  # Diário aberto para acréscimo
+        self._posicao = 0  # Bytes do diário já refletidos no estado entregue à Biblioteca
+        self._compactacao = None  # Thread da compactação em andamento
+        self._trava_compactacao = TravaArquivo(diario_arquivo + ".compactacao")  # Só um processo compacta por vez
+        self._assinaturas = {}  # Última assinatura (mtime, tamanho) vista de cada arquivo
+        self._versoes = {}  # Versão do formato de cada fotografia na última leitura (1 = lista JSON antiga)
+        self._lock = threading.Lock()  # Protege as assinaturas e a troca do diário
+        self._iniciar_trava(diario_arquivo + ".trava")
+
+    # Método para obter a assinatura de um arquivo (data de modificação e tamanho)
+    def assinatura(self, arquivo):
+        try:
+            info = os.stat(arquivo)
+        except FileNotFoundError:
+            return None  # Arquivo ainda não existe
+        return (info.st_mtime_ns, info.st_size)
+
+    # Método para listar as coleções cujo arquivo mudou desde a última leitura ou gravação
+    # O diário entra na lista quando outro processo o trocou por um novo (compactação)
+    def alterados(self):
+        with self._lock:
+            alterados = [
+                nome for nome, arquivo in self.arquivos.items()
+                if nome not in self._assinaturas or self.assinatura(arquivo) != self._assinaturas[nome]
+            ]
+            if self.diario is None or self._identidade_diario() != self.diario.identidade:
+                alterados.append("diario")
+            return alterados
+
+    def _identidade_diario(self):
+        try:
+            return identidade(os.stat(self.diario_arquivo))
+        except FileNotFoundError:
+            return None
+
+    # Método para carregar uma coleção da sua fotografia (no formato atual ou na lista JSON antiga)
+    def carregar(self, nome):
+        arquivo = self.arquivos[nome]
+        # A assinatura é lida antes do conteúdo: se o arquivo mudar durante a leitura, a próxima verificação percebe
+        assinatura = self.assinatura(arquivo)
+        try:
+            with diagnostico.cronometro(f"ArmazenamentoJSON.carregar({nome})"):
+                dados, versao = fotografia.ler(arquivo)  # Dados carregados do arquivo
+            diagnostico.contar("bytes lidos", assinatura[1] if assinatura else 0)
+        except FileNotFoundError:
+            dados, versao = [], None  # Lista vazia se o arquivo não for encontrado (vazio, fotografia.ler já retorna [])
+        # Um arquivo com conteúdo inválido gera fotografia.FotografiaInvalida: tratá-lo como vazio apagaria os dados
+        with self._lock:
+            self._assinaturas[nome] = assinatura
+            self._versoes[nome] = versao
+        return dados
+
+    # Método para carregar o estado completo: fotografias mais os eventos do diário
+    def carregar_estado(self):
+        with self.bloquear():  # Nenhum processo grava nem troca o diário durante a leitura
+            # O .compactando é aberto antes das fotografias: se a compactação terminar durante a leitura e apagar
+            # o arquivo, os seus eventos continuam legíveis por este descritor
+            try:
+                compactando = open(self.compactando_arquivo, "rb")
+            except FileNotFoundError:
+                compactando = None
+
+            estado = {}
+            antigas = {}  # Coleções ainda no formato antigo -> (registros lidos, assinatura do arquivo lido)
+            for nome, chave in self._chaves.items():
+                registros = self.carregar(nome)
+                if self._versoes[nome] == 1:
+                    antigas[nome] = (registros, self._assinaturas[nome])
+                estado[nome] = {registro[chave]: registro for registro in registros}
+
+            # Reaplica primeiro o diário de uma compactação em andamento ou interrompida e depois o diário atual
+            if compactando is not None:
+                with compactando:
+                    for evento in Diario.ler_arquivo(compactando):
+                        aplicar_evento(estado, evento)
+            with self._lock:
+                if self.diario is not None and self._identidade_diario() != self.diario.identidade:
+                    self.diario.fechar()  # Outro processo compactou: o arquivo aberto não é mais o diário
+                    self.diario = None
+                if self.diario is None:
+                    self.diario = Diario(self.diario_arquivo)
+            eventos, self._posicao = Diario.ler_desde(self.diario_arquivo, 0)
+            for evento in eventos:
+                aplicar_evento(estado, evento)
+            self.diario.eventos = sum(peso(evento) for evento in eventos)
+
+            estado = {nome: list(registros.values()) for nome, registros in estado.items()}
+            # Uma compactação foi interrompida (ninguém está com a trava de compactação): conclui agora
+            if compactando is not None and self._trava_compactacao.adquirir(bloquear=False):
+                try:
+                    if os.path.exists(self.compactando_arquivo):
+                        self._gravar_fotografias(estado)
+                        os.remove(self.compactando_arquivo)
+                finally:
+                    self._trava_compactacao.liberar()
+            if antigas:
+                self._converter(antigas)
+        return estado
+
+    # Método para ler o estado completo sem alterar nenhum arquivo (usado pela migração para o SQLite)
+    # Ao contrário de carregar_estado, não abre o diário para acréscimo, não converte as fotografias no formato antigo
+    # e não conclui uma compactação interrompida: as fotografias e os diários são apenas lidos
+    def ler_estado(self):
+        # A trava só é usada se o arquivo dela já existir: sem ele, nenhum processo está usando estes dados
+        with self.bloquear() if os.path.exists(self._trava.arquivo) else nullcontext():
+            try:
+                compactando = open(self.compactando_arquivo, "rb")  # Aberto antes das fotografias, como em carregar_estado
+            except FileNotFoundError:
+                compactando = None
+            estado = {nome: {registro[chave]: registro for registro in self.carregar(nome)} for nome, chave in self._chaves.items()}
+            if compactando is not None:
+                with compactando:
+                    for evento in Diario.ler_arquivo(compactando):
+                        aplicar_evento(estado, evento)
+            for evento in Diario.ler(self.diario_arquivo):
+                aplicar_evento(estado, evento)
+        return {nome: list(registros.values()) for nome, registros in estado.items()}
+
+    # Método para regravar no formato atual as fotografias lidas no formato antigo, com o mesmo conteúdo
+    # Só com a trava de compactação: nenhuma compactação troca as fotografias durante a conversão
+    def _converter(self, antigas):
+        if not self._trava_compactacao.adquirir(bloquear=False):
+            return  # Outro processo está compactando (e já grava no formato atual); a conversão fica para a próxima carga
+        try:
+            for nome, (registros, assinatura) in antigas.items():
+                if self.assinatura(self.arquivos[nome]) == assinatura:  # O arquivo ainda é o que foi lido
+                    self.salvar(nome, registros)
+        finally:
+            self._trava_compactacao.liberar()
+
+    # Método para ler os eventos que outros processos acrescentaram ao diário desde a última leitura
+    def novos_eventos(self):
+        if self.diario is None:
+            return None
+        resultado = Diario.ler_desde(self.diario_arquivo, self._posicao, self.diario.identidade)
+        if resultado is None:
+            return None  # O diário foi trocado: é preciso reler as fotografias
+        eventos, self._posicao = resultado
+        self.diario.eventos += sum(peso(evento) for evento in eventos)
+        return eventos
+
+    # Método para salvar uma coleção na sua fotografia (gravação atômica)
+    def salvar(self, nome, dados):
+        arquivo = self.arquivos[nome]
+        temporario = f"{arquivo}.{os.getpid()}.{threading.get_ident()}.tmp"  # Um temporário por processo e thread
+        with diagnostico.cronometro(f"ArmazenamentoJSON.salvar({nome})"), open(temporario, "w", encoding="utf-8") as f:
+            fotografia.gravar(f, nome, self._chaves[nome], dados)  # Cabeçalho e um registro compacto por linha
+            f.flush()
+            os.fsync(f.fileno())
+            diagnostico.contar("bytes gravados", f.tell())
+            diagnostico.contar("fsyncs")
+        # A troca e a nova assinatura acontecem juntas: alterados() nunca vê a gravação própria como alteração externa
+        with self._lock:
+            os.replace(temporario, arquivo)  # A fotografia antiga só é substituída quando a nova está completa
+            self._assinaturas[nome] = self.assinatura(arquivo)
+
+    def _gravar_fotografias(self, estado):
+        for nome, dados in estado.items():
+            self.salvar(nome, dados)
+
+    # Método para registrar uma alteração no diário
+    # Deve ser chamado com a trava adquirida e depois de ler os novos eventos, para que a posição continue certa
+    def registrar(self, evento):
+        with self._lock:
+            self._posicao += self.diario.registrar(evento)
+
+    # Verifica se o diário cresceu o bastante para ser compactado
+    # Montar o estado para as fotografias custa proporcionalmente ao acervo: exigir um diário com uma fração do
+    # tamanho das fotografias faz a compactação acontecer cada vez mais espaçada à medida que o acervo cresce, e o
+    # custo dividido pelos eventos que a disparam continua o mesmo
+    def precisa_compactar(self):
+        if self._compactacao is not None or self.diario.eventos < self.limite_compactacao:
+            return False
+        with self._lock:
+            fotografias = sum(assinatura[1] for assinatura in self._assinaturas.values() if assinatura)
+        return self._posicao >= self.fracao_compactacao * fotografias
+
+    # Método para compactar o diário em novas fotografias, em segundo plano
+    # O estado recebido deve refletir todos os eventos gravados até aqui
+    def compactar(self, estado):
+        with self.bloquear(), self._lock:
+            if self._compactacao is not None or os.path.exists(self.compactando_arquivo):
+                return  # Já existe uma compactação em andamento
+            if not self._trava_compactacao.adquirir(bloquear=False):
+                return  # Outro processo ainda está gravando as fotografias
+            # Troca o diário: os eventos antigos ficam em .compactando até as fotografias ficarem prontas
+            self.diario.fechar()
+            os.replace(self.diario_arquivo, self.compactando_arquivo)
+            self.diario = Diario(self.diario_arquivo)
+            self._posicao = 0
+            self._compactacao = threading.Thread(target=self._executar_compactacao, args=(estado,), daemon=True)
+            self._compactacao.start()
+
+    def _executar_compactacao(self, estado):
+        try:
+            self._gravar_fotografias(estado)
+            os.remove(self.compactando_arquivo)  # Só some depois que todas as fotografias foram gravadas
+        finally:
+            self._trava_compactacao.liberar()
+            with self._lock:
+                self._compactacao = None
+
+    # Método para esperar a compactação em andamento terminar
+    def aguardar_compactacao(self):
+        compactacao = self._compactacao
+        if compactacao is not None:
+            compactacao.join()
+
+    # Método para fechar o armazenamento, sincronizando o diário com o disco
+    def fechar(self):
+        self.aguardar_compactacao()
+        if self.diario is not None:
+            self.diario.fechar()
+            self.diario = None
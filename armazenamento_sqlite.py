@@ -0,0 +1,215 @@
+import json
+import os
+import sqlite3
+import sys
+import threading
+
+from armazenamento import Armazenamento, ArmazenamentoJSON, ConflitoArmazenamento, peso
+import diagnostico
+
+# Estrutura do banco; os índices cobrem as consultas por ISBN, autor, categoria e por usuário
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS livros (
+    id_exemplar INTEGER PRIMARY KEY,
+    titulo TEXT NOT NULL,
+    autor TEXT NOT NULL,
+    publicacao TEXT NOT NULL,
+    isbn TEXT NOT NULL,
+    categoria TEXT NOT NULL,
+    emprestado INTEGER NOT NULL DEFAULT 0,
+    emprestimos_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS livros_isbn ON livros (isbn);
+CREATE INDEX IF NOT EXISTS livros_autor ON livros (autor);
+CREATE INDEX IF NOT EXISTS livros_categoria ON livros (categoria);
+
+CREATE TABLE IF NOT EXISTS usuarios (
+    ordem INTEGER PRIMARY KEY,
+    email TEXT NOT NULL UNIQUE,
+    nome TEXT NOT NULL,
+    tipo TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS emprestimos (
+    ordem INTEGER PRIMARY KEY,
+    id_exemplar INTEGER NOT NULL UNIQUE REFERENCES livros (id_exemplar),
+    usuario_email TEXT NOT NULL,
+    data_emprestimo TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS emprestimos_usuario ON emprestimos (usuario_email);
+
+CREATE TABLE IF NOT EXISTS eventos (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    evento TEXT NOT NULL
+);
+"""
+MANTER_EVENTOS = 10000  # Eventos recentes guardados para as outras conexões; uma conexão mais atrasada relê tudo
+LOTE_RELEITURA = 1000  # Lotes com mais registros que isso viram um pedido de releitura, em vez de um evento enorme
+
+# Comandos que gravam cada tipo de registro (valores absolutos, como os eventos do diário)
+_GRAVAR_LIVRO = """
+INSERT INTO livros (id_exemplar, titulo, autor, publicacao, isbn, categoria, emprestado, emprestimos_count)
+VALUES (:id_exemplar, :titulo, :autor, :publicacao, :isbn, :categoria, :emprestado, :emprestimos_count)
+ON CONFLICT (id_exemplar) DO UPDATE SET titulo = excluded.titulo, autor = excluded.autor, publicacao = excluded.publicacao,
+    isbn = excluded.isbn, categoria = excluded.categoria, emprestado = excluded.emprestado, emprestimos_count = excluded.emprestimos_count
+"""
+_GRAVAR_USUARIO = "INSERT OR IGNORE INTO usuarios (email, nome, tipo) VALUES (:email, :nome, :tipo)"
+_GRAVAR_EMPRESTIMO = "INSERT INTO emprestimos (id_exemplar, usuario_email, data_emprestimo) VALUES (:id_exemplar, :usuario_email, :data_emprestimo)"
+
+# Classe que guarda os dados da biblioteca num banco SQLite embutido
+# Cada evento vira uma transação: o empréstimo e a devolução alteram o livro e o empréstimo juntos ou não alteram nada
+# A mesma transação acrescenta o evento à tabela eventos, de onde as outras conexões leem só o que mudou
+class ArmazenamentoSQLite(Armazenamento):
+    def __init__(self, banco="biblioteca.db"):
+        self.banco = banco  # Caminho do arquivo do banco
+        self.diretorio = os.path.dirname(os.path.abspath(banco))  # Pasta dos dados
+        # A Biblioteca serializa o acesso com o seu lock; a conexão é usada pelas threads da interface
+        self._conexao = sqlite3.connect(banco, check_same_thread=False)
+        self._conexao.execute("PRAGMA journal_mode=WAL")  # Leitores não bloqueiam o gravador
+        self._conexao.execute("PRAGMA synchronous=NORMAL")
+        self._conexao.execute("PRAGMA foreign_keys=ON")
+        self._conexao.executescript(ESQUEMA)
+        self._versao = None  # Último PRAGMA data_version visto (muda quando outra conexão grava)
+        self._seq = None  # Último evento da tabela eventos já refletido no estado entregue à Biblioteca
+        self._proprios = set()  # Eventos desta conexão gravados depois de eventos ainda não lidos
+        self._lock = threading.Lock()  # Protege a conexão
+        self._iniciar_trava(banco + ".trava")  # Serializa entre processos a leitura do estado e a gravação seguinte
+
+    # Método para obter a versão dos dados; só muda com gravações de outras conexões
+    def _versao_dados(self):
+        return self._conexao.execute("PRAGMA data_version").fetchone()[0]
+
+    # Método para listar as coleções a reler; só antes da primeira carga, depois as mudanças vêm de novos_eventos
+    def alterados(self):
+        with self._lock:
+            if self._seq is None:
+                return ["livros", "usuarios", "emprestimos"]
+            return []
+
+    # Método para obter os eventos gravados por outras conexões desde a última leitura
+    # Retorna None (releitura completa) se os eventos seguintes já foram descartados ou se algum pede releitura
+    def novos_eventos(self):
+        with self._lock:
+            if self._seq is None:
+                return None
+            if self._versao_dados() == self._versao:
+                return []  # Nenhuma outra conexão gravou
+            self._conexao.execute("BEGIN")  # A versão e os eventos lidos na mesma leitura consistente
+            try:
+                self._versao = self._versao_dados()
+                linhas = self._conexao.execute("SELECT seq, evento FROM eventos WHERE seq > ? ORDER BY seq", (self._seq,)).fetchall()
+            finally:
+                self._conexao.execute("COMMIT")
+            if linhas and linhas[0][0] != self._seq + 1:
+                return None  # Os eventos logo depois do último lido já foram descartados
+            eventos = []
+            for seq, texto in linhas:
+                if seq in self._proprios:
+                    self._proprios.discard(seq)  # Já aplicado na memória por quem gravou
+                    continue
+                evento = json.loads(texto)
+                if evento["tipo"] == "recarregar":
+                    return None
+                eventos.append(evento)
+            if linhas:
+                self._seq = linhas[-1][0]
+        diagnostico.contar("linhas lidas do banco", len(linhas))
+        return eventos
+
+    # Método para carregar o estado completo do banco
+    def carregar_estado(self):
+        with self._lock:
+            self._conexao.execute("BEGIN")  # Uma só leitura consistente das três tabelas
+            try:
+                self._versao = self._versao_dados()
+                self._seq = self._conexao.execute("SELECT COALESCE(MAX(seq), 0) FROM eventos").fetchone()[0]
+                self._proprios = set()
+                livros = [
+                    {"id_exemplar": id_exemplar, "titulo": titulo, "autor": autor, "publicacao": publicacao, "isbn": isbn,
+                     "categoria": categoria, "emprestado": bool(emprestado), "emprestimos_count": emprestimos_count}
+                    for id_exemplar, titulo, autor, publicacao, isbn, categoria, emprestado, emprestimos_count in self._conexao.execute(
+                        "SELECT id_exemplar, titulo, autor, publicacao, isbn, categoria, emprestado, emprestimos_count FROM livros ORDER BY id_exemplar")
+                ]
+                usuarios = [
+                    {"nome": nome, "email": email, "tipo": tipo}
+                    for nome, email, tipo in self._conexao.execute("SELECT nome, email, tipo FROM usuarios ORDER BY ordem")
+                ]
+                emprestimos = [
+                    {"id_exemplar": id_exemplar, "usuario_email": usuario_email, "data_emprestimo": data_emprestimo}
+                    for id_exemplar, usuario_email, data_emprestimo in self._conexao.execute(
+                        "SELECT id_exemplar, usuario_email, data_emprestimo FROM emprestimos ORDER BY ordem")
+                ]
+            finally:
+                self._conexao.execute("COMMIT")
+        diagnostico.contar("linhas lidas do banco", len(livros) + len(usuarios) + len(emprestimos))
+        return {"livros": livros, "usuarios": usuarios, "emprestimos": emprestimos}
+
+    # Método para gravar um evento numa transação
+    def registrar(self, evento):
+        tipo = evento["tipo"]
+        with self._lock:
+            with self._conexao:  # Confirma no fim ou desfaz tudo se algo falhar
+                if tipo == "livro":
+                    self._conexao.execute(_GRAVAR_LIVRO, evento["registro"])
+                elif tipo == "livros":
+                    self._conexao.executemany(_GRAVAR_LIVRO, evento["registros"])
+                elif tipo == "usuario":
+                    self._conexao.execute(_GRAVAR_USUARIO, evento["registro"])
+                elif tipo == "usuarios":
+                    self._conexao.executemany(_GRAVAR_USUARIO, evento["registros"])
+                elif tipo == "emprestimo":
+                    # O livro só é marcado se ainda estiver livre no banco; outra conexão pode ter emprestado antes
+                    cursor = self._conexao.execute(
+                        "UPDATE livros SET emprestado = 1, emprestimos_count = ? WHERE id_exemplar = ? AND emprestado = 0",
+                        (evento["emprestimos_count"], evento["id_exemplar"]),
+                    )
+                    if cursor.rowcount != 1:
+                        raise ConflitoArmazenamento(f"Exemplar {evento['id_exemplar']} não está disponível.")
+                    self._conexao.execute(_GRAVAR_EMPRESTIMO, evento)
+                elif tipo == "devolucao":
+                    self._conexao.execute("UPDATE livros SET emprestado = 0 WHERE id_exemplar = ?", (evento["id_exemplar"],))
+                    self._conexao.execute("DELETE FROM emprestimos WHERE id_exemplar = ?", (evento["id_exemplar"],))
+                seq = self._anotar_evento(evento if peso(evento) <= LOTE_RELEITURA else {"tipo": "recarregar"})
+            # Só depois da confirmação: um evento desfeito não pode ser contado como lido
+            if self._seq is not None and seq == self._seq + 1:
+                self._seq = seq  # Nada de outras conexões no meio: o próprio evento já conta como lido
+            else:
+                self._proprios.add(seq)  # Será pulado quando os eventos anteriores forem lidos
+
+    # Método para acrescentar um evento à tabela eventos, dentro da transação de quem gravou; retorna o seu número
+    def _anotar_evento(self, evento):
+        seq = self._conexao.execute("INSERT INTO eventos (evento) VALUES (?)", (json.dumps(evento, separators=(",", ":")),)).lastrowid
+        self._conexao.execute("DELETE FROM eventos WHERE seq <= ?", (seq - MANTER_EVENTOS,))
+        return seq
+
+    # Método para fechar a conexão com o banco
+    def fechar(self):
+        with self._lock:
+            self._conexao.close()
+
+# Função que copia os dados dos arquivos JSON (fotografias mais diário) para um banco SQLite, numa única transação
+# Os arquivos JSON são apenas lidos: só o banco é gravado
+# Retorna a quantidade de livros, usuários e empréstimos migrados
+def migrar_json(banco, livros_arquivo="livros.txt", usuarios_arquivo="usuarios.txt", emprestimos_arquivo="emprestimos.txt",
+                diario_arquivo="diario.txt"):
+    estado = ArmazenamentoJSON(livros_arquivo, usuarios_arquivo, emprestimos_arquivo, diario_arquivo).ler_estado()
+
+    destino = ArmazenamentoSQLite(banco)
+    try:
+        conexao = destino._conexao
+        with conexao:
+            if conexao.execute("SELECT EXISTS (SELECT 1 FROM livros) OR EXISTS (SELECT 1 FROM usuarios)").fetchone()[0]:
+                raise ValueError(f"O banco {banco} já tem dados; a migração só é feita num banco vazio.")
+            conexao.executemany(_GRAVAR_LIVRO, estado["livros"])
+            conexao.executemany(_GRAVAR_USUARIO, estado["usuarios"])
+            conexao.executemany(_GRAVAR_EMPRESTIMO, estado["emprestimos"])
+            destino._anotar_evento({"tipo": "recarregar"})  # Uma conexão já aberta no banco vazio relê tudo
+    finally:
+        destino.fechar()
+    return len(estado["livros"]), len(estado["usuarios"]), len(estado["emprestimos"])
+
+# Uso: python armazenamento_sqlite.py [biblioteca.db]  (migra livros.txt, usuarios.txt e emprestimos.txt)
+if __name__ == "__main__":
+    banco = sys.argv[1] if len(sys.argv) > 1 else "biblioteca.db"
+    livros, usuarios, emprestimos = migrar_json(banco)
+    print(f"Migrados {livros} livros, {usuarios} usuários e {emprestimos} empréstimos para {banco}.")
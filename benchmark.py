@@ -0,0 +1,304 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from armazenamento import ArmazenamentoJSON
+from biblioteca import Biblioteca, ErroBiblioteca, Livro, Usuario
+import fotografia
+
+# Palavras usadas para montar títulos, nomes e categorias sintéticos
+PALAVRAS = ("amor guerra paz tempo mar sol lua noite dia casa cidade rio montanha floresta caminho viagem história segredo "
+            "memória sonho jardim estrela vento fogo pedra livro carta ilha deserto inverno verão outono primavera sombra luz "
+            "coração alma destino mistério reino império povo terra céu").split()
+SOBRENOMES = "Silva Santos Oliveira Souza Lima Pereira Costa Rodrigues Almeida Nascimento Araújo Ribeiro Carvalho Gomes Martins".split()
+CATEGORIAS = ["Romance", "Ficção", "Fantasia", "História", "Biografia", "Poesia", "Ciência", "Tecnologia", "Filosofia", "Infantil",
+              "Suspense", "Terror", "Autoajuda", "Religião", "Arte", "Culinária", "Viagem", "Direito", "Economia", "Educação"]
+
+# Limites do --comparar
+LIMITE_TEMPO = 1.25  # Razão do p50 (agora / antes) acima da qual uma operação conta como regressão
+LIMITE_MEMORIA = 1.10  # Razão dos bytes por livro acima da qual a memória conta como regressão (medição mais estável)
+
+# Função que gera um acervo sintético e grava as fotografias (livros.txt, usuarios.txt, emprestimos.txt) no diretório
+# Cada título tem de 1 a 3 exemplares; cerca de 5% dos exemplares ficam com um empréstimo ativo
+def gerar_dados(diretorio, livros, usuarios=None, semente=42):
+    sorteio = random.Random(semente)
+    usuarios = usuarios or max(10, livros // 20)
+    autores = [f"{sorteio.choice(PALAVRAS).capitalize()} {sorteio.choice(SOBRENOMES)}" for _ in range(max(10, livros // 50))]
+
+    registros_livros = []
+    while len(registros_livros) < livros:
+        titulo = " ".join(sorteio.choice(PALAVRAS) for _ in range(sorteio.randint(2, 5))).capitalize()
+        isbn = f"978-{len(registros_livros):09d}"
+        autor, categoria, publicacao = sorteio.choice(autores), sorteio.choice(CATEGORIAS), str(sorteio.randint(1900, 2024))
+        for _ in range(min(sorteio.randint(1, 3), livros - len(registros_livros))):
+            registros_livros.append({
+                "titulo": titulo, "autor": autor, "publicacao": publicacao, "isbn": isbn, "categoria": categoria,
+                "id_exemplar": len(registros_livros) + 1, "emprestado": False,
+                "emprestimos_count": int(sorteio.expovariate(0.2)),  # Histórico: poucos livros muito emprestados
+            })
+    registros_usuarios = [{"nome": f"Usuário {i}", "email": f"usuario{i}@exemplo.com", "tipo": sorteio.choice(("aluno", "professor", "visitante"))}
+                          for i in range(usuarios)]
+    registros_emprestimos = []
+    for livro in sorteio.sample(registros_livros, len(registros_livros) // 20):
+        livro["emprestado"] = True
+        livro["emprestimos_count"] += 1
+        registros_emprestimos.append({
+            "id_exemplar": livro["id_exemplar"],
+            "usuario_email": sorteio.choice(registros_usuarios)["email"],
+            "data_emprestimo": f"2024-{sorteio.randint(1, 12):02d}-{sorteio.randint(1, 28):02d} {sorteio.randint(8, 20):02d}:{sorteio.randint(0, 59):02d}:00",
+        })
+
+    armazenamento = criar_armazenamento(diretorio)
+    armazenamento.salvar("livros", registros_livros)
+    armazenamento.salvar("usuarios", registros_usuarios)
+    armazenamento.salvar("emprestimos", registros_emprestimos)
+
+# Função que cria o armazenamento JSON com os arquivos dentro do diretório
+def criar_armazenamento(diretorio):
+    caminho = lambda nome: os.path.join(diretorio, nome)
+    return ArmazenamentoJSON(caminho("livros.txt"), caminho("usuarios.txt"), caminho("emprestimos.txt"), caminho("diario.txt"))
+
+# Função que abre a biblioteca de um diretório gerado por gerar_dados
+def abrir(diretorio):
+    return Biblioteca(armazenamento=criar_armazenamento(diretorio))
+
+# Função que cronometra `operacao(i)` para i em range(repeticoes); retorna as estatísticas em milissegundos
+def cronometrar(operacao, repeticoes):
+    tempos = []
+    for i in range(repeticoes):
+        inicio = time.perf_counter()
+        operacao(i)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    tempos.sort()
+    return {
+        "repeticoes": repeticoes,
+        "media_ms": round(statistics.fmean(tempos), 4),
+        "p50_ms": round(tempos[len(tempos) // 2], 4),
+        "p95_ms": round(tempos[min(len(tempos) - 1, int(len(tempos) * 0.95))], 4),
+        "min_ms": round(tempos[0], 4),
+        "max_ms": round(tempos[-1], 4),
+    }
+
+# Função que ignora os erros de regra esperados durante a medição (ex.: livro sorteado já emprestado)
+def tolerante(funcao):
+    def executar(*argumentos):
+        try:
+            funcao(*argumentos)
+        except ErroBiblioteca:
+            pass
+    return executar
+
+# Função que compara o formato das fotografias com a lista JSON indentada usada antes (livros.txt)
+# Mede o tamanho do arquivo, a gravação, a leitura completa e a localização de um exemplar pelo ID
+def medir_formatos(diretorio, livros, repeticoes, semente):
+    fotografia_livros = os.path.join(diretorio, "livros.txt")
+    antigo = os.path.join(diretorio, "livros-antigo.txt")
+    registros, _ = fotografia.ler(fotografia_livros)
+    sorteio = random.Random(semente)
+    ids = [sorteio.randint(1, livros) for _ in range(repeticoes)]
+    vezes = max(1, min(3, repeticoes))
+
+    # Cada gravação cria um arquivo novo, como salvar() faz com o temporário: truncar um arquivo existente
+    # força o ext4 a descarregar os blocos antigos e distorceria a comparação
+    def gravar_antigo(i):
+        if os.path.exists(antigo):
+            os.remove(antigo)
+        with open(antigo, "w") as f:
+            json.dump(registros, f, indent=4)
+
+    def gravar_fotografia(i):
+        os.remove(fotografia_livros)
+        with open(fotografia_livros, "w", encoding="utf-8") as f:
+            fotografia.gravar(f, "livros", "id_exemplar", registros)
+
+    def ler_antigo(i):
+        with open(antigo, "r") as f:
+            return json.load(f)
+
+    def localizar_antigo(i):
+        return next(registro for registro in ler_antigo(i) if registro["id_exemplar"] == ids[i])
+
+    def localizar_fotografia(i):
+        with fotografia.LeitorFotografia(fotografia_livros) as leitor:
+            return leitor.buscar(ids[i])
+
+    resultados = {
+        "json_indentado": {
+            "bytes": None,
+            "salvar": cronometrar(gravar_antigo, vezes),
+            "carregar": cronometrar(ler_antigo, vezes),
+            "localizar": cronometrar(localizar_antigo, vezes),
+        },
+        "fotografia": {
+            "bytes": None,
+            "salvar": cronometrar(gravar_fotografia, vezes),
+            "carregar": cronometrar(lambda i: fotografia.ler(fotografia_livros), vezes),
+            "localizar": cronometrar(localizar_fotografia, repeticoes),
+        },
+    }
+    resultados["json_indentado"]["bytes"] = os.path.getsize(antigo)
+    resultados["fotografia"]["bytes"] = os.path.getsize(fotografia_livros)
+    os.remove(antigo)
+    return resultados
+
+# Função que mede cada operação pública da Biblioteca sobre um acervo de `livros` exemplares
+def medir_escala(livros, repeticoes, memoria, semente):
+    resultados = {}
+    with tempfile.TemporaryDirectory() as diretorio:
+        inicio = time.perf_counter()
+        gerar_dados(diretorio, livros, semente=semente)
+        geracao = time.perf_counter() - inicio
+        formatos = medir_formatos(diretorio, livros, repeticoes, semente)
+
+        # Memória: o que a biblioteca carregada mantém vivo (medido à parte, pois o tracemalloc deixa tudo mais lento)
+        bytes_memoria = None
+        if memoria:
+            gc.collect()
+            tracemalloc.start()
+            biblioteca = abrir(diretorio)
+            gc.collect()
+            bytes_memoria = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            biblioteca.fechar()
+            del biblioteca
+            gc.collect()
+
+        resultados["carregar"] = cronometrar(lambda i: abrir(diretorio).fechar(), max(1, min(3, repeticoes)))
+        biblioteca = abrir(diretorio)
+        try:
+            sorteio = random.Random(semente)
+            ids = [sorteio.randint(1, livros) for _ in range(repeticoes)]
+            emails = [f"usuario{sorteio.randrange(len(biblioteca.usuarios))}@exemplo.com" for _ in range(repeticoes)]
+            titulos = [biblioteca.busca_exemplar(id_exemplar).titulo for id_exemplar in ids]
+            amostra = biblioteca.busca_exemplar(ids[0])
+
+            leituras = {
+                "get_next_id": lambda i: biblioteca.get_next_id(),
+                "busca_exemplar": lambda i: biblioteca.busca_exemplar(ids[i]),
+                "busca_livros_titulo": lambda i: biblioteca.busca_livros("título", titulos[i][:12]),
+                "busca_livros_autor": lambda i: biblioteca.busca_livros("autor", amostra.autor.split()[0]),
+                "busca_livros_categoria": lambda i: biblioteca.busca_livros("categoria", "fic"),
+                "busca_livros_combinada": lambda i: biblioteca.busca_livros_combinada({"autor": amostra.autor, "categoria": amostra.categoria}),
+                "pagina_livros": lambda i: biblioteca.pagina_livros((i * 100) % livros, 100),
+                "pagina_livros_ordenada": lambda i: biblioteca.pagina_livros((i * 100) % livros, 100, "titulo", i % 2 == 1),
+                "livros_por_categoria": lambda i: biblioteca.livros_por_categoria(),
+                "emprestimos_por_usuario": lambda i: biblioteca.emprestimos_por_usuario(),
+                "livros_mais_emprestados": lambda i: biblioteca.livros_mais_emprestados(10),
+                "lista_emprestimos": lambda i: biblioteca.lista_emprestimos(),
+            }
+            for nome, operacao in leituras.items():
+                resultados[nome] = cronometrar(operacao, repeticoes)
+
+            # Gravações (cada uma vai para o diário, com fsync agrupado)
+            resultados["cadastra_emprestimo"] = cronometrar(tolerante(lambda i: biblioteca.cadastra_emprestimo(ids[i], emails[i])), repeticoes)
+            resultados["devolve_livro"] = cronometrar(lambda i: biblioteca.devolve_livro(ids[i]), repeticoes)
+            resultados["cadastra_livro"] = cronometrar(
+                lambda i: biblioteca.cadastra_livro(Livro(f"Novo livro {i}", "Autor Novo", "2024", f"novo-{i}", "Teste", None)), repeticoes)
+            resultados["cadastra_usuario"] = cronometrar(
+                lambda i: biblioteca.cadastra_usuario(Usuario(f"Novo {i}", f"novo{i}@exemplo.com", "aluno")), repeticoes)
+            resultados["cadastra_livros_lote_1000"] = cronometrar(
+                lambda i: biblioteca.cadastra_livros([Livro(f"Lote {i}", "Autor Lote", "2024", f"lote-{i}-{j}", "Teste", None) for j in range(1000)]),
+                max(1, repeticoes // 50))
+        finally:
+            biblioteca.fechar()
+
+    return {
+        "livros": livros,
+        "geracao_s": round(geracao, 3),
+        "memoria_bytes": bytes_memoria,
+        "memoria_bytes_por_livro": round(bytes_memoria / livros, 1) if bytes_memoria else None,
+        "formatos": formatos,
+        "operacoes": resultados,
+    }
+
+# Função que identifica a versão medida (commit do git, se houver)
+def versao_codigo():
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+# Função que imprime os resultados e, se houver uma medição anterior, a razão entre os tempos e entre a memória por
+# livro (>1 = pior agora); retorna as regressões, isto é, as razões acima de `limite_tempo` ou `limite_memoria`
+def imprimir(relatorio, anterior=None, limite_tempo=LIMITE_TEMPO, limite_memoria=LIMITE_MEMORIA):
+    anteriores = {escala["livros"]: escala for escala in anterior["escalas"]} if anterior else {}
+    regressoes = []
+    for escala in relatorio["escalas"]:
+        medida_anterior = anteriores.get(escala["livros"], {})
+        memoria = ""
+        if escala["memoria_bytes"]:
+            memoria = f", {escala['memoria_bytes_por_livro']} bytes/livro"
+            if medida_anterior.get("memoria_bytes_por_livro"):
+                razao = escala["memoria_bytes_por_livro"] / medida_anterior["memoria_bytes_por_livro"]
+                memoria += f" x{razao:.2f}"
+                if razao > limite_memoria:
+                    memoria += " REGRESSÃO"
+                    regressoes.append(f"{escala['livros']} livros: memória x{razao:.2f}")
+        print(f"\n{escala['livros']} livros (gerados em {escala['geracao_s']}s{memoria})")
+        base = medida_anterior.get("operacoes", {})
+        for nome, medida in escala["operacoes"].items():
+            comparacao = ""
+            if nome in base and base[nome]["p50_ms"]:
+                razao = medida["p50_ms"] / base[nome]["p50_ms"]
+                comparacao = f"  x{razao:.2f}"
+                if razao > limite_tempo:
+                    comparacao += " REGRESSÃO"
+                    regressoes.append(f"{escala['livros']} livros: {nome} x{razao:.2f}")
+            print(f"  {nome:<28} p50 {medida['p50_ms']:10.3f} ms  p95 {medida['p95_ms']:10.3f} ms{comparacao}")
+        if escala.get("formatos"):
+            print("  livros.txt: formato        tamanho     salvar   carregar  localizar (p50)")
+            for formato, medida in escala["formatos"].items():
+                print(f"    {formato:<22} {medida['bytes'] / 1024 / 1024:8.1f} MiB {medida['salvar']['p50_ms']:8.1f} ms "
+                      f"{medida['carregar']['p50_ms']:8.1f} ms {medida['localizar']['p50_ms']:8.3f} ms")
+    return regressoes
+
+# Uso: python benchmark.py [--escalas 1000 100000 1000000] [--repeticoes 200] [--saida resultados.json] [--comparar anterior.json]
+#      [--limite-tempo 1.25] [--limite-memoria 1.10]  (com --comparar, termina com código 1 se houver regressões)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mede as operações da Biblioteca sobre acervos sintéticos")
+    parser.add_argument("--escalas", type=int, nargs="+", default=[1000, 100000, 1000000], help="quantidades de livros")
+    parser.add_argument("--repeticoes", type=int, default=200, help="repetições de cada operação")
+    parser.add_argument("--semente", type=int, default=42, help="semente do gerador (mesma semente, mesmos dados)")
+    parser.add_argument("--sem-memoria", action="store_true", help="não mede a memória (a medição com tracemalloc é lenta)")
+    parser.add_argument("--saida", help="arquivo JSON onde gravar os resultados")
+    parser.add_argument("--comparar", help="resultados JSON de uma versão anterior, para comparar")
+    parser.add_argument("--limite-tempo", type=float, default=LIMITE_TEMPO, help="razão do p50 que conta como regressão")
+    parser.add_argument("--limite-memoria", type=float, default=LIMITE_MEMORIA, help="razão dos bytes por livro que conta como regressão")
+    argumentos = parser.parse_args()
+
+    relatorio = {
+        "versao": versao_codigo(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "data": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "repeticoes": argumentos.repeticoes,
+        "semente": argumentos.semente,
+        "escalas": [],
+    }
+    for livros in argumentos.escalas:
+        print(f"Medindo {livros} livros...", file=sys.stderr)
+        relatorio["escalas"].append(medir_escala(livros, argumentos.repeticoes, not argumentos.sem_memoria, argumentos.semente))
+
+    anterior = None
+    if argumentos.comparar:
+        with open(argumentos.comparar, encoding="utf-8") as f:
+            anterior = json.load(f)
+    regressoes = imprimir(relatorio, anterior, argumentos.limite_tempo, argumentos.limite_memoria)
+    if argumentos.saida:
+        with open(argumentos.saida, "w", encoding="utf-8") as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=4)
+    if regressoes:
+        print(f"\n{len(regressoes)} regressões em relação a {anterior.get('versao') or argumentos.comparar}:")
+        for regressao in regressoes:
+            print(f"  {regressao}")
+        sys.exit(1)
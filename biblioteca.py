@@ -0,0 +1,717 @@
+from array import array
+from collections import Counter
+from datetime import datetime, timedelta
+import functools
+import os
+import sys
+import threading
+import warnings
+
+from armazenamento import ArmazenamentoJSON, ConflitoArmazenamento
+import diagnostico
+from historico import PRAZO_EMPRESTIMO, HistoricoEmprestimos
+from indices import IndiceOrdenado, IndiceTextual, IndiceTrigramas, normalizar
+
+# Formato das datas de empréstimo nos arquivos e na interface
+FORMATO_DATA = "%Y-%m-%d %H:%M:%S"
+EPOCA = datetime(1970, 1, 1)  # Referência dos instantes inteiros (segundos, sem fuso horário)
+# Colunas pelas quais uma listagem de livros pode ser ordenada (os campos de Livro.para_dict)
+COLUNAS_LIVROS = ("titulo", "autor", "publicacao", "isbn", "categoria", "id_exemplar", "emprestado", "emprestimos_count")
+
+# Função que interna um texto repetido entre registros (autor, categoria, tipo...): uma só cópia na memória
+def internar(valor):
+    return sys.intern(valor) if isinstance(valor, str) else valor
+
+# Classe que guarda os campos mais alterados dos livros (emprestado e emprestimos_count) em colunas compactas
+# Cada livro recebe a próxima posição livre das colunas, na ordem em que é anexado: um byte e quatro bytes por
+# exemplar, quaisquer que sejam os IDs (um ID enorme vindo de um arquivo antigo não reserva memória para os anteriores)
+class ColunasLivros:
+    __slots__ = ("emprestado", "emprestimos_count")
+
+    def __init__(self):
+        self.emprestado = bytearray()  # 1 se o exemplar está emprestado
+        self.emprestimos_count = array("I")  # Quantas vezes o exemplar foi emprestado
+
+    # Método para passar a guardar os campos de um livro nas colunas, numa posição nova no fim
+    def anexar(self, livro):
+        emprestado, emprestimos_count = livro.emprestado, livro.emprestimos_count  # Lidos antes de mudar a posição
+        self.emprestado.append(1 if emprestado else 0)
+        self.emprestimos_count.append(emprestimos_count)
+        livro._colunas = self
+        livro._posicao = len(self.emprestado) - 1
+
+# Classe que representa um livro na biblioteca
+# Usa __slots__ (sem __dict__ por objeto) e interna os textos que se repetem entre exemplares
+class Livro:
+    __slots__ = ("titulo", "autor", "publicacao", "isbn", "categoria", "id_exemplar", "_colunas", "_posicao")
+
+    def __init__(self, titulo, autor, publicacao, isbn, categoria, id_exemplar):
+        # Inicializa os atributos do livro
+        self.titulo = internar(titulo)  # Título do livro
+        self.autor = internar(autor)  # Autor do livro
+        self.publicacao = internar(publicacao)  # Data de publicação do livro
+        self.isbn = internar(isbn)  # ISBN do livro
+        self.categoria = internar(categoria)  # Categoria do livro
+        self.id_exemplar = id_exemplar  # ID único do exemplar do livro
+        # [emprestado, emprestimos_count] enquanto o livro não está numa biblioteca; depois, as ColunasLivros dela
+        self._colunas = [False, 0]
+        self._posicao = None  # Posição do livro nas ColunasLivros
+
+    # Indica se o livro está emprestado
+    @property
+    def emprestado(self):
+        colunas = self._colunas
+        if type(colunas) is list:
+            return colunas[0]
+        return colunas.emprestado[self._posicao] == 1
+
+    @emprestado.setter
+    def emprestado(self, valor):
+        colunas = self._colunas
+        if type(colunas) is list:
+            colunas[0] = bool(valor)
+        else:
+            colunas.emprestado[self._posicao] = 1 if valor else 0
+
+    # Contador de quantas vezes o livro foi emprestado
+    @property
+    def emprestimos_count(self):
+        colunas = self._colunas
+        if type(colunas) is list:
+            return colunas[1]
+        return colunas.emprestimos_count[self._posicao]
+
+    @emprestimos_count.setter
+    def emprestimos_count(self, valor):
+        colunas = self._colunas
+        if type(colunas) is list:
+            colunas[1] = valor
+        else:
+            colunas.emprestimos_count[self._posicao] = valor
+
+    # Método para criar um livro a partir de um registro salvo
+    @classmethod
+    def de_dict(cls, dados):
+        livro = cls(dados["titulo"], dados["autor"], dados["publicacao"], dados["isbn"], dados["categoria"], dados["id_exemplar"])
+        livro._colunas = [dados.get("emprestado", False), dados.get("emprestimos_count", 0)]
+        return livro
+
+    # Método para converter o livro no registro salvo em arquivo
+    def para_dict(self):
+        return {
+            "titulo": self.titulo,
+            "autor": self.autor,
+            "publicacao": self.publicacao,
+            "isbn": self.isbn,
+            "categoria": self.categoria,
+            "id_exemplar": self.id_exemplar,
+            "emprestado": self.emprestado,
+            "emprestimos_count": self.emprestimos_count,
+        }
+
+# Classe que representa um usuário da biblioteca
+class Usuario:
+    __slots__ = ("nome", "email", "tipo")
+
+    def __init__(self, nome, email, tipo):
+        # Inicializa os atributos do usuário
+        self.nome = nome  # Nome do usuário
+        self.email = internar(email)  # Email do usuário (internado: os empréstimos usam o mesmo texto)
+        self.tipo = internar(tipo)  # Tipo de usuário (ex: aluno, professor)
+
+    # Método para criar um usuário a partir de um registro salvo
+    @classmethod
+    def de_dict(cls, dados):
+        return cls(dados["nome"], dados["email"], dados["tipo"])
+
+    # Método para converter o usuário no registro salvo em arquivo
+    def para_dict(self):
+        return {"nome": self.nome, "email": self.email, "tipo": self.tipo}
+
+# Classe que representa um empréstimo ativo
+# A data fica guardada como um inteiro (segundos desde EPOCA); o texto só é montado quando alguém pede
+class Emprestimo:
+    __slots__ = ("id_exemplar", "usuario_email", "instante")
+
+    def __init__(self, id_exemplar, usuario_email, data_emprestimo):
+        # Inicializa os atributos do empréstimo
+        self.id_exemplar = id_exemplar  # ID do exemplar emprestado
+        self.usuario_email = internar(usuario_email)  # Email do usuário que pegou o livro (o mesmo texto do Usuario)
+        if isinstance(data_emprestimo, str):
+            data_emprestimo = (datetime.fromisoformat(data_emprestimo) - EPOCA) // timedelta(seconds=1)
+        self.instante = data_emprestimo  # Data e hora do empréstimo, em segundos desde EPOCA
+
+    # Data e hora do empréstimo no formato dos arquivos
+    @property
+    def data_emprestimo(self):
+        return (EPOCA + timedelta(seconds=self.instante)).strftime(FORMATO_DATA)
+
+    # Método para criar um empréstimo a partir de um registro salvo
+    @classmethod
+    def de_dict(cls, dados):
+        return cls(dados["id_exemplar"], dados["usuario_email"], dados["data_emprestimo"])
+
+    # Método para converter o empréstimo no registro salvo em arquivo
+    def para_dict(self):
+        return {"id_exemplar": self.id_exemplar, "usuario_email": self.usuario_email, "data_emprestimo": self.data_emprestimo}
+
+# Exceção base dos erros de regra da biblioteca; a mensagem já é própria para mostrar ao usuário
+class ErroBiblioteca(Exception):
+    pass
+
+# Exceção para um empréstimo de livro inexistente ou já emprestado
+class LivroIndisponivel(ErroBiblioteca):
+    pass
+
+# Exceção para um email que não pertence a nenhum usuário
+class UsuarioNaoEncontrado(ErroBiblioteca):
+    pass
+
+# Exceção para o cadastro de um email que já existe
+class UsuarioJaCadastrado(ErroBiblioteca):
+    pass
+
+# Exceção para o cadastro de um id_exemplar que já existe
+class ExemplarJaCadastrado(ErroBiblioteca):
+    pass
+
+# Exceção para o cadastro de um id_exemplar que não é um número inteiro positivo
+class ExemplarInvalido(ErroBiblioteca):
+    pass
+
+# Exceção para uma listagem ou busca por uma coluna ou um critério que não existe
+class ConsultaInvalida(ErroBiblioteca):
+    pass
+
+# Decorador que executa o método com o lock da biblioteca, que pode ser usada por várias threads
+def sincronizado(metodo):
+    nome = f"Biblioteca.{metodo.__name__}"  # Nome da operação no diagnóstico
+    @functools.wraps(metodo)
+    def executar(self, *args, **kwargs):
+        with self._lock:
+            if diagnostico.ATIVO:
+                with diagnostico.cronometro(nome):  # Mede só a execução, sem a espera pelo lock
+                    return metodo(self, *args, **kwargs)
+            return metodo(self, *args, **kwargs)
+    return executar
+
+# Decorador dos métodos que gravam: além do lock das threads, adquire a trava entre processos do armazenamento
+# Assim a leitura do estado atual (sincronizar), a validação e a gravação acontecem sem outro processo no meio
+def exclusivo(metodo):
+    nome = f"Biblioteca.{metodo.__name__}"  # Nome da operação no diagnóstico
+    @functools.wraps(metodo)
+    def executar(self, *args, **kwargs):
+        with self._lock, self.armazenamento.bloquear():
+            if diagnostico.ATIVO:
+                with diagnostico.cronometro(nome):  # Mede só a execução, sem a espera pelas travas
+                    return metodo(self, *args, **kwargs)
+            return metodo(self, *args, **kwargs)
+    return executar
+
+# Classe que gerencia a biblioteca, incluindo livros, usuários e empréstimos
+class Biblioteca:
+    # `armazenamento` permite trocar a persistência (ex.: ArmazenamentoSQLite); por padrão usa os arquivos JSON
+    # `historico` recebe os empréstimos devolvidos; por padrão fica na pasta "historico" ao lado dos dados
+    def __init__(self, livros_arquivo="livros.txt", usuarios_arquivo="usuarios.txt", emprestimos_arquivo="emprestimos.txt", diario_arquivo="diario.txt",
+                 armazenamento=None, historico=None):
+        # Inicializa os arquivos que armazenam os dados da biblioteca
+        self.livros_arquivo = livros_arquivo  # Caminho do arquivo de livros
+        self.usuarios_arquivo = usuarios_arquivo  # Caminho do arquivo de usuários
+        self.emprestimos_arquivo = emprestimos_arquivo  # Caminho do arquivo de empréstimos
+        self.diario_arquivo = diario_arquivo  # Caminho do diário de alterações ainda não compactadas
+        if armazenamento is None:
+            armazenamento = ArmazenamentoJSON(livros_arquivo, usuarios_arquivo, emprestimos_arquivo, diario_arquivo)
+        self.armazenamento = armazenamento  # Camada de persistência
+        if historico is None:
+            historico = HistoricoEmprestimos(os.path.join(armazenamento.diretorio, "historico"))
+        self.historico = historico  # Arquivo mensal dos empréstimos devolvidos
+        self._lock = threading.RLock()  # Impede que duas threads alterem os dados ao mesmo tempo
+
+        # Dados mantidos em memória; os arquivos só são lidos de novo quando mudam externamente
+        self.livros = []  # Lista de objetos Livro
+        self.usuarios = []  # Lista de objetos Usuario
+        self.emprestimos = {}  # Empréstimos ativos indexados pelo id_exemplar (na ordem em que foram feitos)
+
+        # Índices atualizados a cada alteração, para que as buscas por chave não percorram as listas
+        self._livros_por_id = {}  # id_exemplar -> Livro
+        self._usuarios_por_email = {}  # email -> Usuario
+        self._exemplares_por_isbn = {}  # ISBN -> lista de exemplares (Livro)
+        self._indice_titulos = IndiceTrigramas()  # Trigramas dos títulos para a busca aproximada
+        self._indices_texto = {"autor": IndiceTextual(), "categoria": IndiceTextual()}  # Busca por trecho, sem acentos
+        self._indices_ordenados = {}  # Coluna -> IndiceOrdenado, criado na primeira vez que a coluna é ordenada
+        self._versao_titulos = 0  # Incrementada a cada título indexado e a cada recarga: invalida o filtro por título guardado
+        self._versao_colunas = Counter()  # Coluna -> quantidade de alterações: invalida só as ordenações por essa coluna
+        self._filtro_titulos = (None, [], {})  # ((_versao_titulos, valor), IDs, {(coluna, decrescente): (versão, IDs ordenados)})
+        self._maior_id = 0  # Maior id_exemplar cadastrado
+        self._colunas = ColunasLivros()  # emprestado e emprestimos_count de todos os exemplares
+
+        # Agregados dos relatórios, atualizados a cada cadastro, empréstimo e devolução
+        self._livros_por_categoria = Counter()  # Categoria -> quantidade de livros
+        self._emprestimos_por_tipo = Counter()  # Tipo de usuário -> quantidade de empréstimos ativos
+        self._mais_emprestados = IndiceOrdenado()  # (-emprestimos_count, id_exemplar): os primeiros são os mais emprestados
+        self._emprestimos_por_instante = IndiceOrdenado()  # (instante, id_exemplar) dos empréstimos ativos, do mais antigo ao mais novo
+        self.versao = 0  # Incrementada a cada alteração; permite que a interface reaproveite páginas já buscadas
+        self.sincronizar()  # Carrega os dados pela primeira vez
+
+    # Método para recarregar os dados quando algum arquivo foi alterado por fora (mtime ou tamanho)
+    # Os eventos que outros processos acrescentaram ao diário são aplicados um a um, sem reler tudo
+    @sincronizado
+    def sincronizar(self):
+        eventos = None if self.armazenamento.alterados() else self.armazenamento.novos_eventos()
+        if eventos is None:
+            self._recarregar()
+        elif eventos:
+            for evento in eventos:
+                self._aplicar_evento(evento)
+            self.versao += 1
+            diagnostico.contar("eventos aplicados", len(eventos))
+
+    # Método para reler o estado completo do armazenamento
+    def _recarregar(self):
+        # As etapas são medidas separadamente no diagnóstico: leitura dos arquivos, conversão e índices
+        with diagnostico.cronometro("armazenamento.carregar_estado"):
+            estado = self.armazenamento.carregar_estado()  # Fotografias com o diário reaplicado
+        with diagnostico.cronometro("Biblioteca.converter_registros"):
+            self.livros = [Livro.de_dict(dados) for dados in estado["livros"]]
+            self.usuarios = [Usuario.de_dict(dados) for dados in estado["usuarios"]]
+            self.emprestimos = {dados["id_exemplar"]: Emprestimo.de_dict(dados) for dados in estado["emprestimos"]}
+        with diagnostico.cronometro("Biblioteca.reconstruir_indices"):
+            self._reconstruir_indices()
+        self.versao += 1
+        diagnostico.contar("registros carregados", len(self.livros) + len(self.usuarios) + len(self.emprestimos))
+
+    # Método para aplicar na memória um evento gravado por outro processo
+    def _aplicar_evento(self, evento):
+        tipo = evento["tipo"]
+        if tipo in ("livro", "livros"):
+            for registro in evento["registros"] if tipo == "livros" else [evento["registro"]]:
+                if registro["id_exemplar"] not in self._livros_por_id:
+                    self._incluir_livro(Livro.de_dict(registro))
+        elif tipo in ("usuario", "usuarios"):
+            for registro in evento["registros"] if tipo == "usuarios" else [evento["registro"]]:
+                if registro["email"] not in self._usuarios_por_email:
+                    self._incluir_usuario(Usuario.de_dict(registro))
+        elif tipo == "emprestimo":
+            emprestimo = Emprestimo(evento["id_exemplar"], evento["usuario_email"], evento["data_emprestimo"])
+            self._abrir_emprestimo(emprestimo, evento["emprestimos_count"])
+        elif tipo == "devolucao":
+            self._encerrar_emprestimo(evento["id_exemplar"])
+
+    # Método para reconstruir todos os índices a partir dos dados carregados
+    def _reconstruir_indices(self):
+        self._versao_titulos += 1  # Os livros recarregados podem ter outros valores em qualquer coluna
+        self._livros_por_id = {}
+        self._exemplares_por_isbn = {}
+        self._indice_titulos = IndiceTrigramas()
+        self._indices_texto = {campo: IndiceTextual() for campo in self._indices_texto}
+        self._indices_ordenados = {}
+        self._maior_id = 0
+        self._colunas = ColunasLivros()
+        self._livros_por_categoria = Counter()
+        self._mais_emprestados = None  # Montado de uma vez depois do laço, em vez de um insort por livro
+        for livro in self.livros:
+            self._indexar_livro(livro)
+        self._mais_emprestados = IndiceOrdenado((-livro.emprestimos_count, livro.id_exemplar) for livro in self.livros)
+        self._usuarios_por_email = {usuario.email: usuario for usuario in self.usuarios}
+        self._emprestimos_por_tipo = Counter()
+        for emprestimo in self.emprestimos.values():
+            self._contar_emprestimo(emprestimo, 1)
+        self._emprestimos_por_instante = IndiceOrdenado((emprestimo.instante, emprestimo.id_exemplar) for emprestimo in self.emprestimos.values())
+
+    # Método para incluir um livro nos índices
+    def _indexar_livro(self, livro):
+        self._colunas.anexar(livro)
+        self._livros_por_id[livro.id_exemplar] = livro
+        self._exemplares_por_isbn.setdefault(livro.isbn, []).append(livro)
+        self._indice_titulos.adicionar(livro.id_exemplar, livro.titulo)
+        self._versao_titulos += 1
+        for campo, indice in self._indices_texto.items():
+            indice.adicionar(livro.id_exemplar, getattr(livro, campo))
+        for coluna, indice in self._indices_ordenados.items():
+            indice.adicionar(self._chave_ordenacao(coluna, livro), livro.id_exemplar)
+        self._livros_por_categoria[livro.categoria] += 1
+        if self._mais_emprestados is not None:
+            self._mais_emprestados.adicionar(-livro.emprestimos_count, livro.id_exemplar)
+        self._maior_id = max(self._maior_id, livro.id_exemplar)
+
+    # Método para obter a chave com que um livro é ordenado por uma coluna (textos sem acento e sem caixa)
+    def _chave_ordenacao(self, coluna, livro):
+        valor = getattr(livro, coluna)
+        return normalizar(valor) if isinstance(valor, str) else valor
+
+    # Método para obter o índice ordenado de uma coluna, montando-o na primeira vez
+    # Só as colunas da listagem são aceitas: o índice fica guardado e é atualizado a cada cadastro
+    def _indice_ordenado(self, coluna):
+        if coluna not in COLUNAS_LIVROS:
+            raise ConsultaInvalida(f"Coluna inválida: {coluna}; use {', '.join(COLUNAS_LIVROS)}.")
+        indice = self._indices_ordenados.get(coluna)
+        if indice is None:
+            indice = IndiceOrdenado((self._chave_ordenacao(coluna, livro), livro.id_exemplar) for livro in self.livros)
+            self._indices_ordenados[coluna] = indice
+        return indice
+
+    # Método para alterar os campos de um livro mantendo os índices ordenados em dia
+    def _alterar_livro(self, livro, **valores):
+        afetados = [coluna for coluna in valores if coluna in self._indices_ordenados]
+        for coluna in afetados:
+            self._indices_ordenados[coluna].remover(self._chave_ordenacao(coluna, livro), livro.id_exemplar)
+        if "emprestimos_count" in valores:
+            self._mais_emprestados.remover(-livro.emprestimos_count, livro.id_exemplar)
+        for campo, valor in valores.items():
+            setattr(livro, campo, valor)
+            self._versao_colunas[campo] += 1
+        for coluna in afetados:
+            self._indices_ordenados[coluna].adicionar(self._chave_ordenacao(coluna, livro), livro.id_exemplar)
+        if "emprestimos_count" in valores:
+            self._mais_emprestados.adicionar(-livro.emprestimos_count, livro.id_exemplar)
+
+    # Método para obter o índice textual de um critério de busca (autor ou categoria)
+    def _indice_texto(self, criterio):
+        indice = self._indices_texto.get(criterio)
+        if indice is None:
+            raise ConsultaInvalida(f"Critério inválido: {criterio}; use título, autor ou categoria.")
+        return indice
+
+    # Método para incluir um livro novo na lista e nos índices
+    def _incluir_livro(self, livro):
+        self.livros.append(livro)
+        self._indexar_livro(livro)
+
+    # Método para incluir um usuário novo na lista e no índice por email
+    def _incluir_usuario(self, usuario):
+        self.usuarios.append(usuario)
+        self._usuarios_por_email[usuario.email] = usuario
+
+    # Método para somar (ou subtrair) um empréstimo ativo na contagem por tipo de usuário
+    def _contar_emprestimo(self, emprestimo, quantidade):
+        usuario = self._usuarios_por_email.get(emprestimo.usuario_email)
+        if usuario:
+            self._emprestimos_por_tipo[usuario.tipo] += quantidade
+            if not self._emprestimos_por_tipo[usuario.tipo]:
+                del self._emprestimos_por_tipo[usuario.tipo]  # O relatório só lista tipos com empréstimos ativos
+
+    # Método para marcar um empréstimo na memória: o livro fica emprestado e o empréstimo entra nos ativos
+    def _abrir_emprestimo(self, emprestimo, emprestimos_count):
+        livro = self._livros_por_id.get(emprestimo.id_exemplar)
+        if livro:
+            self._alterar_livro(livro, emprestado=True, emprestimos_count=emprestimos_count)
+        anterior = self.emprestimos.pop(emprestimo.id_exemplar, None)
+        if anterior:
+            self._contar_emprestimo(anterior, -1)
+            self._emprestimos_por_instante.remover(anterior.instante, anterior.id_exemplar)
+        self.emprestimos[emprestimo.id_exemplar] = emprestimo  # Entra no fim: os ativos ficam na ordem em que foram feitos
+        self._contar_emprestimo(emprestimo, 1)
+        self._emprestimos_por_instante.adicionar(emprestimo.instante, emprestimo.id_exemplar)
+
+    # Método para marcar uma devolução na memória; retorna o empréstimo encerrado (ou None)
+    def _encerrar_emprestimo(self, id_exemplar):
+        livro = self._livros_por_id.get(id_exemplar)
+        if livro:
+            self._alterar_livro(livro, emprestado=False)
+        emprestimo = self.emprestimos.pop(id_exemplar, None)
+        if emprestimo:
+            self._contar_emprestimo(emprestimo, -1)
+            self._emprestimos_por_instante.remover(emprestimo.instante, emprestimo.id_exemplar)
+        return emprestimo
+
+    # Método para gravar uma alteração no diário antes de aplicá-la na memória
+    def _registrar(self, evento):
+        self.armazenamento.registrar(evento)
+        self.versao += 1
+
+    # Método para compactar o diário quando ficar grande; chamado depois que a memória reflete todos os eventos
+    def _compactar_se_necessario(self):
+        if self.armazenamento.precisa_compactar():
+            estado = {
+                "livros": [livro.para_dict() for livro in self.livros],
+                "usuarios": [usuario.para_dict() for usuario in self.usuarios],
+                "emprestimos": [emprestimo.para_dict() for emprestimo in self.emprestimos.values()],
+            }
+            self.armazenamento.compactar(estado)
+
+    # Método para fechar a biblioteca, garantindo que o diário foi gravado no disco
+    @sincronizado
+    def fechar(self):
+        self.armazenamento.fechar()
+        self.historico.fechar()
+
+    # Método para obter o próximo ID disponível para um livro
+    # Só é garantido dentro deste processo; para cadastrar, passe id_exemplar=None e deixe cadastra_livro reservar o ID
+    @sincronizado
+    def get_next_id(self):
+        self.sincronizar()
+        return self._maior_id + 1  # Retorna o próximo ID (1 se não houver livros cadastrados)
+
+    # Método para obter um exemplar pelo seu ID
+    @sincronizado
+    def busca_exemplar(self, id_exemplar):
+        self.sincronizar()
+        return self._livros_por_id.get(id_exemplar)
+
+    # Método para obter todos os exemplares de um ISBN
+    @sincronizado
+    def exemplares_por_isbn(self, isbn):
+        self.sincronizar()
+        return list(self._exemplares_por_isbn.get(isbn, []))
+
+    # Método para obter o conjunto de ISBNs já cadastrados (uma consulta só, em vez de uma por ISBN)
+    @sincronizado
+    def isbns_cadastrados(self):
+        self.sincronizar()
+        return set(self._exemplares_por_isbn)
+
+    # Método para obter o conjunto de emails já cadastrados
+    @sincronizado
+    def emails_cadastrados(self):
+        self.sincronizar()
+        return set(self._usuarios_por_email)
+
+    # Método para listar todos os livros cadastrados
+    @sincronizado
+    def listar_todos_livros(self):
+        self.sincronizar()
+        return [livro.para_dict() for livro in self.livros]  # Retorna a lista de livros
+
+    # Método para obter uma página da listagem de livros
+    # `coluna` ordena pela coluna (None = ordem de cadastro); `filtro` é um par (critério, valor) como na busca
+    # Retorna o total de livros da listagem e os livros da página
+    @sincronizado
+    def pagina_livros(self, inicio, quantidade, coluna=None, decrescente=False, filtro=None):
+        self.sincronizar()
+        if filtro:
+            # Os IDs do filtro vêm dos índices de busca; só eles são ordenados
+            criterio, valor = filtro
+            if coluna is not None and coluna not in COLUNAS_LIVROS:
+                raise ConsultaInvalida(f"Coluna inválida: {coluna}; use {', '.join(COLUNAS_LIVROS)}.")
+            if criterio == "título":
+                ids = self._filtro_por_titulo(valor, coluna, decrescente)
+            else:
+                ids = self._ordenar_ids(self._indice_texto(criterio).buscar(valor), coluna, decrescente)
+            total = len(ids)
+            ids = ids[inicio:inicio + quantidade]
+        elif coluna is None:
+            total = len(self.livros)
+            if decrescente:
+                fim = total - inicio
+                livros = self.livros[max(0, fim - quantidade):max(0, fim)][::-1]
+            else:
+                livros = self.livros[inicio:inicio + quantidade]
+            return total, [livro.para_dict() for livro in livros]
+        else:
+            indice = self._indice_ordenado(coluna)
+            total = len(indice)
+            ids = indice.fatia(inicio, quantidade, decrescente)
+        return total, [self._livros_por_id[i].para_dict() for i in ids]
+
+    # Método para ordenar IDs de livros por uma coluna (None = ordem de cadastro)
+    def _ordenar_ids(self, ids, coluna, decrescente):
+        if coluna is None:
+            return sorted(ids, reverse=decrescente)
+        return sorted(ids, key=lambda i: (self._chave_ordenacao(coluna, self._livros_por_id[i]), i), reverse=decrescente)
+
+    # Método para obter os IDs do filtro por título, já ordenados para a listagem
+    # A busca só é refeita quando entram títulos novos, e cada ordenação fica guardada até a sua coluna mudar:
+    # os empréstimos só alteram emprestado e emprestimos_count, então trocar de página quase nunca refaz nada
+    def _filtro_por_titulo(self, valor, coluna, decrescente):
+        chave = (self._versao_titulos, valor)
+        if self._filtro_titulos[0] != chave:
+            # Todos os títulos acima da similaridade mínima, sem limite: o total da listagem é o real
+            self._filtro_titulos = (chave, self._indice_titulos.buscar(valor, 0.3, None), {})
+        _, encontrados, ordenacoes = self._filtro_titulos
+        versao = self._versao_colunas[coluna]
+        ordenacao = ordenacoes.get((coluna, decrescente))
+        if ordenacao is None or ordenacao[0] != versao:
+            ordenacao = ordenacoes[(coluna, decrescente)] = (versao, self._ordenar_ids(encontrados, coluna, decrescente))
+        return ordenacao[1]
+
+    # Método para verificar o id_exemplar informado num cadastro: um inteiro a partir de 1 que ainda não existe
+    def _validar_exemplar(self, id_exemplar):
+        if type(id_exemplar) is not int or id_exemplar < 1:
+            raise ExemplarInvalido(f"ID de exemplar inválido: {id_exemplar!r}; use um número inteiro a partir de 1.")
+        if id_exemplar in self._livros_por_id:
+            raise ExemplarJaCadastrado(f"Exemplar {id_exemplar} já cadastrado.")
+
+    # Método para cadastrar um novo livro; retorna o livro cadastrado
+    # Um livro sem id_exemplar (None) recebe o próximo ID, reservado com a trava entre processos adquirida
+    @exclusivo
+    def cadastra_livro(self, livro):
+        self.sincronizar()
+        if livro.id_exemplar is None:
+            livro.id_exemplar = self._maior_id + 1
+        else:
+            self._validar_exemplar(livro.id_exemplar)
+        self._registrar({"tipo": "livro", "registro": livro.para_dict()})  # Grava o cadastro no diário
+        self._incluir_livro(livro)  # Adiciona o novo livro à lista e aos índices
+        self._compactar_se_necessario()
+        return livro
+
+    # Método para cadastrar vários livros com uma única gravação; retorna os livros cadastrados
+    # Os livros sem id_exemplar (None) recebem IDs consecutivos, reservados de uma só vez
+    @exclusivo
+    def cadastra_livros(self, livros):
+        self.sincronizar()
+        # Nada é gravado se algum ID informado for inválido, já existir ou se repetir no próprio lote
+        ids = set()
+        for livro in livros:
+            if livro.id_exemplar is not None:
+                self._validar_exemplar(livro.id_exemplar)
+                if livro.id_exemplar in ids:
+                    raise ExemplarJaCadastrado(f"Exemplar {livro.id_exemplar} repetido no lote.")
+                ids.add(livro.id_exemplar)
+        # Os IDs novos começam depois dos informados no lote, para não coincidir com eles
+        proximo = max(self._maior_id, max(ids, default=0)) + 1
+        for livro in livros:
+            if livro.id_exemplar is None:
+                livro.id_exemplar = proximo
+                proximo += 1
+        self._registrar({"tipo": "livros", "registros": [livro.para_dict() for livro in livros]})  # Um só evento para o lote
+        self._indices_ordenados = {}  # Remontados na próxima ordenação: mais barato que inserir livro a livro
+        for livro in livros:
+            self._incluir_livro(livro)
+        self._compactar_se_necessario()
+        return livros
+
+    # Método para cadastrar vários usuários com uma única gravação; retorna os usuários cadastrados
+    @exclusivo
+    def cadastra_usuarios(self, usuarios):
+        self.sincronizar()
+        # Nada é gravado se algum email já existir ou se repetir no próprio lote
+        emails = set()
+        for usuario in usuarios:
+            if usuario.email in self._usuarios_por_email or usuario.email in emails:
+                raise UsuarioJaCadastrado(f"Usuário já cadastrado com o e-mail {usuario.email}.")
+            emails.add(usuario.email)
+        self._registrar({"tipo": "usuarios", "registros": [usuario.para_dict() for usuario in usuarios]})
+        for usuario in usuarios:
+            self._incluir_usuario(usuario)
+        self._compactar_se_necessario()
+        return usuarios
+
+    # Método para cadastrar um novo usuário; retorna o usuário cadastrado
+    @exclusivo
+    def cadastra_usuario(self, usuario):
+        self.sincronizar()
+        # Verifica se o email já está cadastrado
+        if usuario.email in self._usuarios_por_email:
+            raise UsuarioJaCadastrado("Usuário já cadastrado com este e-mail.")
+        self._registrar({"tipo": "usuario", "registro": usuario.para_dict()})  # Grava o cadastro no diário
+        self._incluir_usuario(usuario)  # Adiciona o novo usuário à lista
+        self._compactar_se_necessario()
+        return usuario
+
+    # Método para registrar um empréstimo de livro; retorna o empréstimo criado
+    @exclusivo
+    def cadastra_emprestimo(self, id_exemplar, usuario_email):
+        self.sincronizar()  # Com a trava adquirida, inclui os empréstimos feitos por outros processos
+
+        # Busca o livro que será emprestado
+        livro = self._livros_por_id.get(id_exemplar)
+        if livro and livro.emprestado:
+            livro = None  # Livro encontrado, mas já está emprestado
+        # Busca o usuário que está solicitando o empréstimo
+        usuario = self._usuarios_por_email.get(usuario_email)
+
+        # Verifica se o livro não foi encontrado ou já está emprestado
+        if not livro:
+            raise LivroIndisponivel("Livro não encontrado ou já emprestado!")
+        # Verifica se o usuário não foi encontrado
+        if not usuario:
+            raise UsuarioNaoEncontrado("Usuário não encontrado!")
+
+        # Cria um novo registro de empréstimo
+        novo_emprestimo = Emprestimo(id_exemplar, usuario_email, datetime.now().strftime(FORMATO_DATA))
+        # Um único evento cobre o livro e o empréstimo: não há como gravar só metade
+        try:
+            self._registrar({
+                "tipo": "emprestimo",
+                "id_exemplar": id_exemplar,
+                "usuario_email": usuario_email,
+                "data_emprestimo": novo_emprestimo.data_emprestimo,
+                "emprestimos_count": livro.emprestimos_count + 1,
+            })
+        except ConflitoArmazenamento:
+            # Outro processo emprestou o livro antes; a próxima sincronização traz o estado novo
+            raise LivroIndisponivel("Livro não encontrado ou já emprestado!")
+        # Marca o livro como emprestado, incrementa o contador e adiciona o empréstimo aos ativos
+        self._abrir_emprestimo(novo_emprestimo, livro.emprestimos_count + 1)
+        self._compactar_se_necessario()
+        return novo_emprestimo
+
+    # Método para listar todos os empréstimos ativos
+    @sincronizado
+    def lista_emprestimos(self):
+        self.sincronizar()
+        return list(self.emprestimos.values())  # Retorna os empréstimos na ordem em que foram feitos
+
+    # Método para listar os empréstimos ativos feitos há mais de `prazo` dias (em relação a `agora`), do mais antigo
+    # O índice por instante não depende da ordem em que os empréstimos foram carregados (migração, arquivos editados...)
+    @sincronizado
+    def emprestimos_atrasados(self, prazo=PRAZO_EMPRESTIMO, agora=None):
+        self.sincronizar()
+        limite = ((agora or datetime.now()) - EPOCA - timedelta(days=prazo)) // timedelta(seconds=1)
+        return [self.emprestimos[id_exemplar] for id_exemplar in self._emprestimos_por_instante.antes_de(limite)]
+
+    # Método para devolver um livro; retorna o empréstimo encerrado (None se não havia empréstimo ativo)
+    # O empréstimo encerrado vai para o histórico, com a data da devolução
+    # Uma falha ao arquivar não desfaz a devolução: gera um RuntimeWarning e é contada no diagnóstico
+    @exclusivo
+    def devolve_livro(self, id_exemplar):
+        self.sincronizar()
+        if id_exemplar not in self.emprestimos:
+            return None  # Nenhum empréstimo ativo: nada é gravado
+        data_devolucao = datetime.now().strftime(FORMATO_DATA)
+        self._registrar({"tipo": "devolucao", "id_exemplar": id_exemplar, "data_devolucao": data_devolucao})  # Grava a devolução no diário
+        emprestimo = self._encerrar_emprestimo(id_exemplar)  # Libera o livro e remove o empréstimo dos ativos
+        # Ainda com a trava adquirida: só este processo arquiva esta devolução
+        try:
+            self.historico.arquivar(emprestimo, data_devolucao)
+        except OSError as erro:
+            # A devolução já está gravada no diário: uma falha do histórico não a desfaz, só fica registrada
+            diagnostico.contar("falhas ao arquivar")
+            warnings.warn(f"Devolução do exemplar {id_exemplar} não foi arquivada no histórico: {erro}", RuntimeWarning)
+        self._compactar_se_necessario()
+        return emprestimo
+
+    # Método para buscar livros com base em um critério
+    # Na busca por título, os resultados vêm do mais parecido para o menos parecido, limitados a `maximo`
+    @sincronizado
+    def busca_livros(self, criterio, valor, maximo=50):
+        self.sincronizar()
+        if criterio.lower() == "título":
+            # Só os títulos que compartilham trigramas com o valor buscado são comparados com o difflib
+            ids = self._indice_titulos.buscar(valor, 0.3, maximo)
+        else:
+            # Autor e categoria: busca por trecho no índice textual, na ordem de cadastro
+            ids = sorted(self._indice_texto(criterio).buscar(valor))
+        return [self._livros_por_id[id_exemplar] for id_exemplar in ids]
+
+    # Método para buscar livros que atendem a todos os critérios ao mesmo tempo (ex: autor E categoria)
+    # Recebe um dicionário {"autor": ..., "categoria": ...} e retorna os livros na ordem de cadastro
+    @sincronizado
+    def busca_livros_combinada(self, criterios):
+        self.sincronizar()
+        # Intersecta os conjuntos de IDs de cada índice, começando pelo menor
+        conjuntos = sorted((self._indice_texto(campo).buscar(valor) for campo, valor in criterios.items()), key=len)
+        if not conjuntos:
+            return []
+        ids = conjuntos[0].intersection(*conjuntos[1:])
+        return [self._livros_por_id[id_exemplar] for id_exemplar in sorted(ids)]
+
+    # Método para contar livros por categoria; retorna {categoria: quantidade}
+    @sincronizado
+    def livros_por_categoria(self):
+        self.sincronizar()
+        return dict(self._livros_por_categoria)  # Contagem mantida a cada cadastro
+
+    # Método para contar empréstimos ativos por tipo de usuário; retorna {tipo: quantidade}
+    @sincronizado
+    def emprestimos_por_usuario(self):
+        self.sincronizar()
+        return dict(self._emprestimos_por_tipo)  # Contagem mantida a cada empréstimo e devolução
+
+    # Método para listar os livros mais emprestados (os 3 primeiros, por padrão)
+    # No empate, vem primeiro o exemplar de menor ID (o cadastrado antes)
+    @sincronizado
+    def livros_mais_emprestados(self, quantidade=3):
+        self.sincronizar()
+        return [self._livros_por_id[id_exemplar] for id_exemplar in self._mais_emprestados.fatia(0, quantidade)]
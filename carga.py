@@ -0,0 +1,133 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+
+# Requisições de leitura sorteadas pelo teste de carga (caminho com parâmetros)
+LEITURAS = [
+    "/livros?inicio=0&quantidade=50",
+    "/livros?inicio=0&quantidade=50&coluna=titulo",
+    "/livro?id_exemplar={id}",
+    "/busca?criterio=autor&valor=autor",
+    "/busca?criterio=t%C3%ADtulo&valor=livro%20{id}&maximo=10",
+    "/emprestimos",
+    "/relatorios/categorias",
+    "/relatorios/usuarios",
+    "/relatorios/mais-emprestados?quantidade=5",
+]
+
+# Classe que mantém uma conexão keep-alive com o servidor
+class Conexao:
+    def __init__(self, endereco, porta):
+        self.endereco = endereco
+        self.porta = porta
+        self.leitor = None
+        self.escritor = None
+
+    # Método para enviar uma requisição e ler a resposta; retorna (situação, corpo em JSON)
+    async def requisitar(self, metodo, caminho, dados=None):
+        if self.escritor is None:
+            self.leitor, self.escritor = await asyncio.open_connection(self.endereco, self.porta)
+        corpo = json.dumps(dados).encode("utf-8") if dados is not None else b""
+        self.escritor.write(
+            f"{metodo} {caminho} HTTP/1.1\r\nHost: {self.endereco}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(corpo)}\r\n\r\n".encode("latin-1") + corpo
+        )
+        await self.escritor.drain()
+        situacao = int((await self.leitor.readline()).split()[1])
+        cabecalhos = {}
+        while True:
+            linha = await self.leitor.readline()
+            if linha in (b"\r\n", b""):
+                break
+            nome, _, valor = linha.decode("latin-1").partition(":")
+            cabecalhos[nome.strip().lower()] = valor.strip()
+        resposta = await self.leitor.readexactly(int(cabecalhos.get("content-length", 0)))
+        if cabecalhos.get("connection", "").lower() == "close":
+            self.fechar()
+        return situacao, json.loads(resposta) if resposta else None
+
+    def fechar(self):
+        if self.escritor is not None:
+            self.escritor.close()
+            self.escritor = None
+
+# Função que prepara dados mínimos no servidor: alguns livros e usuários para as leituras e empréstimos
+async def preparar(endereco, porta, livros, usuarios):
+    conexao = Conexao(endereco, porta)
+    ids = []
+    for i in range(livros):
+        situacao, livro = await conexao.requisitar("POST", "/livros", {
+            "titulo": f"Livro {i}", "autor": f"Autor {i % 20}", "publicacao": "2024", "isbn": f"carga-{i}", "categoria": f"Categoria {i % 5}",
+        })
+        ids.append(livro["id_exemplar"])
+    emails = []
+    for i in range(usuarios):
+        email = f"carga{i}-{time.time_ns()}@exemplo.com"
+        await conexao.requisitar("POST", "/usuarios", {"nome": f"Usuário {i}", "email": email, "tipo": ("aluno", "professor")[i % 2]})
+        emails.append(email)
+    conexao.fechar()
+    return ids, emails
+
+# Função executada por cada cliente simulado; guarda a latência de cada requisição
+async def cliente(endereco, porta, requisicoes, proporcao_escrita, ids, emails, latencias, erros, semente):
+    sorteio = random.Random(semente)
+    conexao = Conexao(endereco, porta)
+    try:
+        for _ in range(requisicoes):
+            inicio = time.perf_counter()
+            if sorteio.random() < proporcao_escrita:
+                id_exemplar = sorteio.choice(ids)
+                if sorteio.random() < 0.5:
+                    situacao, _ = await conexao.requisitar("POST", "/emprestimos", {"id_exemplar": id_exemplar, "usuario_email": sorteio.choice(emails)})
+                else:
+                    situacao, _ = await conexao.requisitar("POST", "/devolucoes", {"id_exemplar": id_exemplar})
+                tipo = "escrita"
+                esperado = situacao < 500  # 404/409 são respostas normais (livro já emprestado ou sem empréstimo)
+            else:
+                caminho = sorteio.choice(LEITURAS).format(id=sorteio.choice(ids))
+                situacao, _ = await conexao.requisitar("GET", caminho)
+                tipo = "leitura"
+                esperado = situacao == 200
+            latencias[tipo].append(time.perf_counter() - inicio)
+            if not esperado:
+                erros.append(situacao)
+    finally:
+        conexao.fechar()
+
+# Função que calcula um percentil (em milissegundos) de uma lista de latências
+def percentil(valores, fracao):
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(fracao * len(ordenados)))] * 1000
+
+async def principal(argumentos):
+    ids, emails = await preparar(argumentos.endereco, argumentos.porta, argumentos.livros, argumentos.usuarios)
+    latencias = {"leitura": [], "escrita": []}
+    erros = []
+    inicio = time.perf_counter()
+    await asyncio.gather(*(
+        cliente(argumentos.endereco, argumentos.porta, argumentos.requisicoes, argumentos.escrita, ids, emails, latencias, erros, semente)
+        for semente in range(argumentos.clientes)
+    ))
+    segundos = time.perf_counter() - inicio
+    total = sum(len(valores) for valores in latencias.values())
+    print(f"{argumentos.clientes} clientes, {total} requisições em {segundos:.2f}s ({total / segundos:.0f} req/s), {len(erros)} erros")
+    for tipo, valores in latencias.items():
+        if valores:
+            print(f"  {tipo:<8} {len(valores):6d} req  p50 {percentil(valores, 0.5):7.2f} ms  p95 {percentil(valores, 0.95):7.2f} ms  "
+                  f"p99 {percentil(valores, 0.99):7.2f} ms  máx {max(valores) * 1000:7.2f} ms")
+
+# Uso: python carga.py [--clientes 200] [--requisicoes 50] [--escrita 0.05] [--porta 8080]
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Teste de carga do servidor da biblioteca (servidor.py)")
+    parser.add_argument("--endereco", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8080)
+    parser.add_argument("--clientes", type=int, default=200, help="conexões simultâneas")
+    parser.add_argument("--requisicoes", type=int, default=50, help="requisições por conexão")
+    parser.add_argument("--escrita", type=float, default=0.05, help="proporção de empréstimos/devoluções")
+    parser.add_argument("--livros", type=int, default=50, help="livros cadastrados antes do teste")
+    parser.add_argument("--usuarios", type=int, default=10, help="usuários cadastrados antes do teste")
+    asyncio.run(principal(parser.parse_args()))
@@ -0,0 +1,194 @@
+from collections import Counter, deque
+from contextlib import contextmanager
+import atexit
+import io
+import os
+import threading
+import time
+
+# Instrumentação opcional das operações da biblioteca
+# BIBLIOTECA_DIAGNOSTICO=1 liga os cronômetros e contadores; sem ela, cada ponto instrumentado custa só um teste
+# BIBLIOTECA_PERFIL=cprofile|tracemalloc também liga a captura de perfil (funções mais lentas ou maiores alocações)
+# BIBLIOTECA_DIAGNOSTICO_ARQUIVO muda o arquivo do resumo gravado ao sair (padrão: diagnostico.txt)
+# Os módulos de perfil (cProfile, pstats, tracemalloc) só são importados pelas funções que os usam
+PERFIL = os.environ.get("BIBLIOTECA_PERFIL", "").strip().lower()
+ATIVO = os.environ.get("BIBLIOTECA_DIAGNOSTICO", "").strip() not in ("", "0") or PERFIL in ("cprofile", "tracemalloc")
+ARQUIVO = os.environ.get("BIBLIOTECA_DIAGNOSTICO_ARQUIVO", "diagnostico.txt")
+RECENTES = 500  # Quantas operações recentes são guardadas para o resumo das mais lentas
+
+_lock = threading.Lock()
+_local = threading.local()  # Pilha de operações em andamento em cada thread
+_recentes = deque(maxlen=RECENTES)  # (nome, segundos, instante, contadores) das últimas operações
+_estatisticas = {}  # Nome -> [quantidade, tempo total, tempo máximo]
+_contadores = Counter()  # Totais de cada contador desde o início
+_perfis = []  # Um cProfile.Profile por thread que executou operações
+_perfis_ativos = set()  # Perfis medindo uma operação agora: não podem ser lidos por outra thread
+
+# Função que liga a instrumentação durante a execução (ex.: pela aba Diagnóstico)
+def ativar(perfil=None):
+    global ATIVO, PERFIL
+    if perfil:
+        PERFIL = perfil
+    if PERFIL == "tracemalloc":
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(10)  # Guarda 10 quadros da pilha de cada alocação
+    ATIVO = True
+
+# Função que desliga a instrumentação; o que já foi medido continua disponível no resumo
+def desativar():
+    global ATIVO
+    ATIVO = False
+
+# Função que apaga as medições feitas até agora
+def limpar():
+    with _lock:
+        _recentes.clear()
+        _estatisticas.clear()
+        _contadores.clear()
+        _perfis[:] = [perfil for perfil in _perfis if perfil in _perfis_ativos]  # Os em uso continuam valendo
+
+# Função que soma `quantidade` a um contador (bytes lidos, registros percorridos, acertos de cache...)
+# O valor também é atribuído às operações em andamento na thread, que o mostram no resumo
+def contar(nome, quantidade=1):
+    if not ATIVO or not quantidade:
+        return
+    with _lock:
+        _contadores[nome] += quantidade
+    for operacao in getattr(_local, "pilha", ()):
+        operacao[nome] += quantidade
+
+def _perfil_da_thread():
+    import cProfile
+    perfil = getattr(_local, "perfil", None)
+    with _lock:
+        if perfil is None or perfil not in _perfis:  # Primeira operação da thread ou medições apagadas
+            perfil = _local.perfil = cProfile.Profile()
+            _perfis.append(perfil)
+        _perfis_ativos.add(perfil)
+    return perfil
+
+# Função que junta os perfis das threads num pstats.Stats (None se nenhum tiver chamadas registradas)
+def _estatisticas_perfil(stream=None):
+    if not _perfis:
+        return None  # O cProfile nunca foi usado: nem é preciso importar o pstats
+    import pstats
+    estatisticas = None
+    with _lock:  # Impede que uma thread volte a ligar o seu perfil enquanto ele é lido
+        for perfil in _perfis:
+            if perfil in _perfis_ativos:
+                continue
+            try:
+                if estatisticas is None:
+                    estatisticas = pstats.Stats(perfil, stream=stream)
+                else:
+                    estatisticas.add(perfil)
+            except TypeError:
+                pass  # Perfil sem nenhuma chamada registrada
+    return estatisticas
+
+# Gerenciador de contexto que mede o tempo de uma operação
+# Operações aninhadas são medidas separadamente; o perfil (cProfile) cobre só a mais externa de cada thread
+@contextmanager
+def cronometro(nome):
+    if not ATIVO:
+        yield
+        return
+    import tracemalloc  # Já carregado depois da primeira operação medida
+    pilha = _local.__dict__.setdefault("pilha", [])
+    contadores = Counter()
+    perfil = _perfil_da_thread() if PERFIL == "cprofile" and not pilha else None
+    memoria = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+    pilha.append(contadores)
+    if perfil is not None:
+        perfil.enable()
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        segundos = time.perf_counter() - inicio
+        if perfil is not None:
+            perfil.disable()
+            with _lock:
+                _perfis_ativos.discard(perfil)
+        pilha.pop()
+        if memoria is not None:
+            contadores["bytes alocados"] += tracemalloc.get_traced_memory()[0] - memoria
+        with _lock:
+            estatistica = _estatisticas.setdefault(nome, [0, 0.0, 0.0])
+            estatistica[0] += 1
+            estatistica[1] += segundos
+            estatistica[2] = max(estatistica[2], segundos)
+            _recentes.append((nome, segundos, time.time(), dict(contadores)))
+
+# Função que descreve os contadores de uma operação numa linha curta
+def _descrever(contadores):
+    return ", ".join(f"{nome}={valor}" for nome, valor in sorted(contadores.items()))
+
+# Função que monta o resumo em texto: totais por operação, operações recentes mais lentas, contadores e perfil
+def resumo(mais_lentas=20, funcoes=25):
+    with _lock:
+        estatisticas = {nome: list(valores) for nome, valores in _estatisticas.items()}
+        recentes = list(_recentes)
+        contadores = dict(_contadores)
+    linhas = []
+    if not ATIVO and not estatisticas:
+        linhas.append("Diagnóstico desligado. Defina BIBLIOTECA_DIAGNOSTICO=1 (ou BIBLIOTECA_PERFIL=cprofile|tracemalloc) antes de abrir o programa.")
+        return "\n".join(linhas)
+
+    linhas.append(f"Perfil: {PERFIL or 'nenhum'}  -  {'ligado' if ATIVO else 'desligado'}")
+    linhas.append("")
+    linhas.append("Operações (ordenadas pelo tempo total):")
+    linhas.append(f"  {'operação':<40} {'chamadas':>9} {'total ms':>10} {'média ms':>9} {'máx ms':>9}")
+    for nome, (quantidade, total, maximo) in sorted(estatisticas.items(), key=lambda item: -item[1][1]):
+        linhas.append(f"  {nome:<40} {quantidade:>9} {total * 1000:>10.1f} {total / quantidade * 1000:>9.2f} {maximo * 1000:>9.2f}")
+
+    linhas.append("")
+    linhas.append(f"Operações recentes mais lentas (das últimas {len(recentes)}):")
+    for nome, segundos, instante, contadores_operacao in sorted(recentes, key=lambda item: -item[1])[:mais_lentas]:
+        horario = time.strftime("%H:%M:%S", time.localtime(instante))
+        detalhes = f"  [{_descrever(contadores_operacao)}]" if contadores_operacao else ""
+        linhas.append(f"  {horario} {segundos * 1000:9.2f} ms  {nome}{detalhes}")
+
+    if contadores:
+        linhas.append("")
+        linhas.append("Contadores:")
+        for nome, valor in sorted(contadores.items()):
+            linhas.append(f"  {nome:<40} {valor:>12}")
+
+    texto = io.StringIO()
+    estatisticas_perfil = _estatisticas_perfil(texto)
+    if estatisticas_perfil is not None:
+        estatisticas_perfil.sort_stats("cumulative").print_stats(funcoes)
+        linhas.append("")
+        linhas.append(f"cProfile (as {funcoes} funções de maior tempo acumulado):")
+        linhas.extend("  " + linha for linha in texto.getvalue().strip("\n").splitlines())
+
+    import tracemalloc
+    if tracemalloc.is_tracing():
+        atual, pico = tracemalloc.get_traced_memory()
+        linhas.append("")
+        linhas.append(f"tracemalloc: {atual / 1024 / 1024:.1f} MiB em uso, pico de {pico / 1024 / 1024:.1f} MiB. Maiores alocações:")
+        for estatistica in tracemalloc.take_snapshot().statistics("lineno")[:funcoes]:
+            linhas.append(f"  {estatistica}")
+    return "\n".join(linhas)
+
+# Função que grava o resumo num arquivo de texto; com o cProfile ativo, grava também o perfil bruto (.prof)
+# que pode ser aberto com pstats ou snakeviz
+def gravar_resumo(arquivo=None):
+    arquivo = arquivo or ARQUIVO
+    with open(arquivo, "w", encoding="utf-8") as f:
+        f.write(resumo() + "\n")
+    estatisticas_perfil = _estatisticas_perfil()
+    if estatisticas_perfil is not None:
+        estatisticas_perfil.dump_stats(os.path.splitext(arquivo)[0] + ".prof")
+    return arquivo
+
+# Ao sair do programa, grava o resumo se alguma operação foi medida
+def _gravar_ao_sair():
+    if _estatisticas:
+        gravar_resumo()
+
+if ATIVO:
+    ativar()
+atexit.register(_gravar_ao_sair)
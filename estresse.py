@@ -0,0 +1,133 @@
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+from armazenamento import ArmazenamentoJSON, Diario
+from biblioteca import Biblioteca, ErroBiblioteca, Livro, Usuario
+
+LIVROS = 200  # Exemplares cadastrados antes do teste (poucos, para haver disputa pelos mesmos livros)
+USUARIOS = 20  # Usuários cadastrados antes do teste
+
+# Função que abre a biblioteca de um diretório; a compactação frequente exercita a troca do diário entre processos
+# (sem a fração mínima do tamanho das fotografias, só o limite de eventos decide quando compactar)
+def abrir(diretorio, limite_compactacao):
+    caminho = lambda nome: os.path.join(diretorio, nome)
+    armazenamento = ArmazenamentoJSON(caminho("livros.txt"), caminho("usuarios.txt"), caminho("emprestimos.txt"),
+                                      caminho("diario.txt"), limite_compactacao=limite_compactacao, fracao_compactacao=0)
+    return Biblioteca(armazenamento=armazenamento)
+
+# Função executada por cada processo: empréstimos, devoluções e cadastros aleatórios
+# Retorna (empréstimos aceitos, IDs cadastrados, operações feitas)
+def trabalhar(diretorio, operacoes, limite_compactacao, semente):
+    sorteio = random.Random(semente)
+    biblioteca = abrir(diretorio, limite_compactacao)
+    emprestimos = 0
+    cadastrados = []
+    try:
+        for _ in range(operacoes):
+            escolha = sorteio.random()
+            try:
+                if escolha < 0.6:
+                    biblioteca.cadastra_emprestimo(sorteio.randint(1, LIVROS), f"usuario{sorteio.randrange(USUARIOS)}@exemplo.com")
+                    emprestimos += 1
+                elif escolha < 0.95:
+                    biblioteca.devolve_livro(sorteio.randint(1, LIVROS))
+                else:
+                    livro = biblioteca.cadastra_livro(Livro("Livro novo", "Autor", "2024", f"novo-{semente}", "Teste", None))
+                    cadastrados.append(livro.id_exemplar)
+            except ErroBiblioteca:
+                pass  # Livro já emprestado: disputa esperada
+    finally:
+        biblioteca.fechar()
+    return emprestimos, cadastrados, operacoes
+
+# Função que prepara um diretório com os livros e usuários iniciais
+def preparar(diretorio):
+    biblioteca = abrir(diretorio, 1000)
+    biblioteca.cadastra_livros([Livro(f"Livro {i}", "Autor", "2000", f"isbn-{i}", "Teste", None) for i in range(LIVROS)])
+    biblioteca.cadastra_usuarios([Usuario(f"Usuário {i}", f"usuario{i}@exemplo.com", ("aluno", "professor")[i % 2]) for i in range(USUARIOS)])
+    biblioteca.fechar()
+
+# Função que confere o estado final com o que os processos relataram; retorna a lista de problemas encontrados
+def conferir(diretorio, resultados):
+    biblioteca = abrir(diretorio, 1000)
+    try:
+        problemas = []
+        emprestimos = sum(resultado[0] for resultado in resultados)
+        cadastrados = [id_exemplar for resultado in resultados for id_exemplar in resultado[1]]
+        ids = [livro.id_exemplar for livro in biblioteca.livros]
+        if len(set(cadastrados)) != len(cadastrados):
+            problemas.append("o mesmo id_exemplar foi reservado por dois cadastros")
+        if len(set(ids)) != len(ids) or len(ids) != LIVROS + len(cadastrados):
+            problemas.append(f"{len(ids)} exemplares gravados, esperados {LIVROS + len(cadastrados)}")
+        total = sum(livro.emprestimos_count for livro in biblioteca.livros)
+        if total != emprestimos:
+            problemas.append(f"emprestimos_count soma {total}, mas {emprestimos} empréstimos foram aceitos")
+        emprestados = {livro.id_exemplar for livro in biblioteca.livros if livro.emprestado}
+        if emprestados != set(biblioteca.emprestimos):
+            problemas.append("livros marcados como emprestados não batem com os empréstimos ativos")
+        return problemas
+    finally:
+        biblioteca.fechar()
+
+# Função que roda o teste com `processos` processos e imprime a vazão e o resultado da conferência
+def rodar(processos, operacoes, limite_compactacao):
+    with tempfile.TemporaryDirectory() as diretorio:
+        preparar(diretorio)
+        inicio = time.perf_counter()
+        with multiprocessing.Pool(processos) as pool:
+            resultados = pool.starmap(trabalhar, [(diretorio, operacoes, limite_compactacao, semente) for semente in range(processos)])
+        segundos = time.perf_counter() - inicio
+        problemas = conferir(diretorio, resultados)
+    total = sum(resultado[2] for resultado in resultados)
+    situacao = "OK" if not problemas else "FALHOU: " + "; ".join(problemas)
+    print(f"{processos:2d} processos: {total} operações em {segundos:.2f}s ({total / segundos:.0f} op/s) - {situacao}")
+    return not problemas
+
+# Função que simula um diário corrompido: um processo cai no meio de uma gravação e outro continua acrescentando
+# eventos ao mesmo arquivo (grudados no resto da gravação interrompida); imprime o resultado da conferência
+def rodar_diario_corrompido():
+    with tempfile.TemporaryDirectory() as diretorio:
+        preparar(diretorio)
+        diario = os.path.join(diretorio, "diario.txt")
+        biblioteca = abrir(diretorio, 1000)
+        try:
+            with open(diario, "ab") as f:
+                f.write(b'{"tipo":"livro","registro":{"titulo":"Gravacao interrom')  # A queda: sem o fim e sem a quebra de linha
+            grudado = biblioteca.cadastra_livro(Livro("Depois da queda", "Autor", "2024", "queda-1", "Teste", None))
+            with open(diario, "ab") as f:
+                f.write(b"lixo que nao e JSON\n")  # Uma linha inteira sem nenhum evento aproveitável
+            seguinte = biblioteca.cadastra_livro(Livro("Depois do lixo", "Autor", "2024", "queda-2", "Teste", None))
+            biblioteca.cadastra_emprestimo(grudado.id_exemplar, "usuario0@exemplo.com")
+        finally:
+            biblioteca.fechar()
+        problemas = []
+        lidos = list(Diario.ler(diario))
+        if lidos != Diario.ler_desde(diario, 0)[0]:
+            problemas.append("a leitura completa e a leitura por posição do diário não aplicam os mesmos eventos")
+        try:
+            biblioteca = abrir(diretorio, 1000)  # Outro processo abrindo a biblioteca depois da corrupção
+        except Exception as erro:
+            problemas.append(f"a biblioteca não abre: {erro!r}")
+        else:
+            try:
+                if biblioteca.busca_exemplar(seguinte.id_exemplar) is None:
+                    problemas.append("o livro cadastrado depois da linha corrompida se perdeu")
+                if biblioteca.busca_exemplar(grudado.id_exemplar) is None or grudado.id_exemplar not in biblioteca.emprestimos:
+                    problemas.append("o evento grudado na gravação interrompida se perdeu")
+            finally:
+                biblioteca.fechar()
+    situacao = "OK" if not problemas else "FALHOU: " + "; ".join(problemas)
+    print(f"diário corrompido: {len(lidos)} eventos lidos - {situacao}")
+    return not problemas
+
+# Uso: python estresse.py [operações por processo] [limite de compactação]
+if __name__ == "__main__":
+    operacoes = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    limite_compactacao = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    corretos = [rodar(processos, operacoes, limite_compactacao) for processos in (1, 2, 4, 8)]
+    corretos.append(rodar_diario_corrompido())
+    sys.exit(0 if all(corretos) else 1)
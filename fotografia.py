@@ -0,0 +1,181 @@
+from itertools import islice
+import json
+import mmap
+import os
+import sys
+
+# Formato das fotografias (livros.txt, usuarios.txt, emprestimos.txt): uma linha de cabeçalho e um registro JSON
+# compacto por linha. Exemplo:
+#   {"formato":"biblioteca-fotografia","versao":2,"colecao":"livros","chave":"id_exemplar","registros":2,"ordenado":true}
+#   {"titulo":"Dom Casmurro","autor":"Machado de Assis",...,"id_exemplar":1,...}
+#   {"titulo":"Dom Casmurro","autor":"Machado de Assis",...,"id_exemplar":2,...}
+# A versão 1 é o formato antigo: uma lista JSON indentada; continua sendo lida e é convertida na primeira carga
+FORMATO = "biblioteca-fotografia"
+VERSAO = 2
+
+_codificar = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode  # Registro numa linha, sem espaços
+
+# Exceção para uma fotografia gravada num formato que esta versão do programa não conhece
+class FormatoNaoSuportado(Exception):
+    pass
+
+# Exceção para uma fotografia com conteúdo que não pode ser interpretado (arquivo corrompido ou editado à mão)
+# Nunca é tratada como coleção vazia: a próxima compactação gravaria a coleção vazia por cima dos dados
+class FotografiaInvalida(Exception):
+    pass
+
+# Função que grava os registros de uma coleção num arquivo aberto em modo texto (UTF-8)
+# `ordenado` no cabeçalho diz se as chaves estão em ordem crescente, o que permite a busca binária na leitura
+def gravar(f, colecao, chave, registros):
+    chaves = [registro[chave] for registro in registros]
+    try:
+        ordenado = all(anterior < seguinte for anterior, seguinte in zip(chaves, islice(chaves, 1, None)))
+    except TypeError:
+        ordenado = False  # Chaves de tipos diferentes não têm ordem
+    cabecalho = {"formato": FORMATO, "versao": VERSAO, "colecao": colecao, "chave": chave, "registros": len(registros), "ordenado": ordenado}
+    f.write(json.dumps(cabecalho, ensure_ascii=False, separators=(",", ":")) + "\n")
+    f.writelines(_codificar(registro) + "\n" for registro in registros)
+
+# Função que interpreta a linha de cabeçalho; retorna None se a linha não for um cabeçalho
+def ler_cabecalho(linha):
+    try:
+        cabecalho = json.loads(linha)
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(cabecalho, dict) or cabecalho.get("formato") != FORMATO:
+        return None
+    if cabecalho.get("versao", 0) > VERSAO:
+        raise FormatoNaoSuportado(f"Fotografia na versão {cabecalho['versao']}; esta versão do programa lê até a {VERSAO}.")
+    return cabecalho
+
+# Função que lê todos os registros de uma fotografia; retorna (registros, versão do formato)
+# Arquivo vazio (ou só com linhas em branco): ([], None). Formato antigo (lista JSON): (registros, 1)
+# FileNotFoundError segue para quem chamou; conteúdo que não pode ser interpretado gera FotografiaInvalida
+def ler(arquivo):
+    with open(arquivo, "rb") as f:
+        primeira = f.readline()
+        while primeira and not primeira.strip():
+            primeira = f.readline()  # Linhas em branco antes do conteúdo não contam
+        if not primeira:
+            return [], None
+        if primeira.lstrip().startswith(b"["):
+            try:
+                return json.loads(primeira + f.read()), 1
+            except json.JSONDecodeError as erro:
+                raise FotografiaInvalida(f"{arquivo}: lista JSON inválida ({erro}).")
+        cabecalho = ler_cabecalho(primeira)
+        if cabecalho is None:
+            raise FotografiaInvalida(f"{arquivo}: cabeçalho de fotografia inválido.")
+        corpo = f.read().rstrip()
+    if not corpo.strip():
+        return [], VERSAO
+    # As quebras de linha só aparecem entre registros (dentro dos textos elas ficam escapadas como \n):
+    # trocadas por vírgulas, o corpo vira uma única lista JSON, interpretada de uma vez só
+    try:
+        return json.loads(b"[" + corpo.replace(b"\n", b",") + b"]"), VERSAO
+    except json.JSONDecodeError:
+        pass
+    # Caminho lento, só para arquivos com linhas em branco no meio: interpreta linha a linha para apontar o erro
+    registros = []
+    for numero, linha in enumerate(corpo.split(b"\n"), 2):
+        if not linha.strip():
+            continue
+        try:
+            registros.append(json.loads(linha))
+        except json.JSONDecodeError as erro:
+            raise FotografiaInvalida(f"{arquivo}, linha {numero}: registro inválido ({erro}).")
+    return registros, VERSAO
+
+# Classe que abre uma fotografia por mapeamento em memória, sem interpretar o arquivo inteiro
+# Permite contar os registros, localizar um pela chave e percorrê-los um a um
+# O arquivo aberto continua o mesmo mesmo que uma nova fotografia o substitua (a gravação troca o arquivo inteiro)
+class LeitorFotografia:
+    def __init__(self, arquivo):
+        self.arquivo = arquivo
+        with open(arquivo, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                raise FormatoNaoSuportado(f"{arquivo} está vazio.")
+            self._mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)  # O mapa continua válido depois de fechar o arquivo
+        self._inicio = self._mapa.find(b"\n") + 1  # Primeiro byte depois do cabeçalho
+        cabecalho = ler_cabecalho(self._mapa[:self._inicio or len(self._mapa)])
+        if cabecalho is None:
+            self._mapa.close()
+            raise FormatoNaoSuportado(f"{arquivo} não está no formato de fotografia (use um programa da biblioteca para convertê-lo).")
+        self.cabecalho = cabecalho
+        self.chave = cabecalho["chave"]  # Campo que identifica os registros (id_exemplar, email...)
+
+    def __len__(self):
+        return self.cabecalho["registros"]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *erro):
+        self.fechar()
+
+    # Método para percorrer os registros, interpretando uma linha por vez
+    def __iter__(self):
+        posicao = self._inicio
+        while posicao < len(self._mapa):
+            fim = self._mapa.find(b"\n", posicao)
+            if fim == -1:
+                fim = len(self._mapa)
+            if fim > posicao:
+                yield json.loads(self._mapa[posicao:fim])
+            posicao = fim + 1
+
+    # Método para obter a linha que contém o byte `posicao`; retorna (início, fim) da linha
+    def _linha(self, posicao):
+        inicio = self._mapa.rfind(b"\n", 0, posicao) + 1
+        fim = self._mapa.find(b"\n", posicao)
+        return inicio, (len(self._mapa) if fim == -1 else fim)
+
+    # Método para localizar o registro com a chave informada; retorna None se não existir
+    # Com as chaves em ordem, é uma busca binária: só cerca de log2(registros) linhas são interpretadas
+    def buscar(self, valor):
+        if self.cabecalho.get("ordenado"):
+            return self._buscar_ordenado(valor)
+        return self._buscar_sequencial(valor)
+
+    def _buscar_ordenado(self, valor):
+        baixo, alto = self._inicio, len(self._mapa)  # O registro, se existir, está numa linha entre baixo e alto
+        while baixo < alto:
+            inicio, fim = self._linha((baixo + alto) // 2)
+            registro = json.loads(self._mapa[inicio:fim])
+            chave = registro[self.chave]
+            if chave == valor:
+                return registro
+            if chave < valor:
+                baixo = fim + 1
+            else:
+                alto = inicio
+        return None
+
+    # Sem ordem, procura o trecho "chave":valor exatamente como o gravador o escreve, sem interpretar as linhas
+    def _buscar_sequencial(self, valor):
+        trecho = _codificar({self.chave: valor})[1:-1].encode("utf-8")
+        posicao = self._mapa.find(trecho, self._inicio)
+        while posicao != -1:
+            inicio, fim = self._linha(posicao)
+            registro = json.loads(self._mapa[inicio:fim])
+            if registro.get(self.chave) == valor:
+                return registro
+            posicao = self._mapa.find(trecho, fim)
+        return None
+
+    def fechar(self):
+        self._mapa.close()
+
+# Uso: python fotografia.py livros.txt [chave]  (mostra o cabeçalho ou o registro com a chave; IDs são números)
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3):
+        print("Uso: python fotografia.py arquivo [chave]")
+        sys.exit(2)
+    with LeitorFotografia(sys.argv[1]) as leitor:
+        if len(sys.argv) == 2:
+            print(json.dumps(leitor.cabecalho, ensure_ascii=False))
+        else:
+            valor = sys.argv[2]
+            registro = leitor.buscar(int(valor) if valor.isdigit() else valor)
+            print(json.dumps(registro, ensure_ascii=False, indent=4) if registro else "Registro não encontrado.")
+            sys.exit(0 if registro else 1)
@@ -0,0 +1,202 @@
+import argparse
+from collections import Counter
+import csv
+from datetime import date, datetime, timedelta
+import json
+import os
+import re
+import threading
+
+FORMATO_DATA = "%Y-%m-%d %H:%M:%S"  # O mesmo formato das datas de empréstimo (biblioteca.FORMATO_DATA)
+PRAZO_EMPRESTIMO = 14  # Dias que um livro pode ficar emprestado antes de ser considerado atrasado
+CAMPOS = ["id_exemplar", "usuario_email", "data_emprestimo", "data_devolucao"]  # Campos de cada registro arquivado
+_PARTICAO = re.compile(r"^(\d{4}-\d{2})\.jsonl$")  # Nome dos arquivos das partições (AAAA-MM.jsonl)
+
+# Função que converte uma data (datetime, date ou texto "AAAA-MM", "AAAA-MM-DD[ HH:MM:SS]") no texto usado nos registros
+# Como o formato começa pelo ano, comparar os textos é o mesmo que comparar as datas
+def texto_data(valor):
+    if valor is None:
+        return None
+    if isinstance(valor, datetime):
+        return valor.strftime(FORMATO_DATA)
+    if isinstance(valor, date):
+        return datetime(valor.year, valor.month, valor.day).strftime(FORMATO_DATA)
+    if len(valor) == 7:
+        valor += "-01"  # Só o mês: começa no dia 1
+    return datetime.fromisoformat(valor).strftime(FORMATO_DATA)
+
+# Função que calcula quantos dias um empréstimo arquivado durou (com fração)
+def duracao(registro):
+    inicio = datetime.fromisoformat(registro["data_emprestimo"])
+    fim = datetime.fromisoformat(registro["data_devolucao"])
+    return (fim - inicio) / timedelta(days=1)
+
+# Função que lê os registros de uma partição, um por linha
+# A última linha sem quebra ainda está sendo gravada e fica para a próxima leitura; uma linha cortada por uma
+# queda do processo é pulada (a gravação seguinte começa numa linha nova)
+def ler_particao(arquivo):
+    try:
+        f = open(arquivo, "r", encoding="utf-8")
+    except FileNotFoundError:
+        return
+    with f:
+        for linha in f:
+            if not linha.endswith("\n"):
+                return
+            try:
+                yield json.loads(linha)
+            except json.JSONDecodeError:
+                continue
+
+# Classe que arquiva os empréstimos devolvidos, um arquivo JSON lines por mês do empréstimo (historico/2024-03.jsonl)
+# Os arquivos só recebem registros no fim; as consultas por período abrem apenas os meses do período
+# Vários processos podem arquivar ao mesmo tempo: cada registro é uma única linha gravada em modo de acréscimo
+class HistoricoEmprestimos:
+    def __init__(self, diretorio="historico"):
+        self.diretorio = diretorio  # Pasta das partições
+        self._arquivos = {}  # Mês -> arquivo aberto para acréscimo
+        self._lock = threading.Lock()  # Protege os arquivos abertos
+
+    # Método para obter o caminho da partição de um mês ("AAAA-MM")
+    def caminho(self, mes):
+        return os.path.join(self.diretorio, f"{mes}.jsonl")
+
+    # Método para listar os meses com partição, em ordem, opcionalmente limitados ao período [inicio, fim)
+    def meses(self, inicio=None, fim=None):
+        try:
+            nomes = os.listdir(self.diretorio)
+        except FileNotFoundError:
+            return []
+        primeiro = inicio[:7] if inicio else None
+        # O fim não entra no período: "2024-04-01 00:00:00" termina no mês de março
+        ultimo = (datetime.fromisoformat(fim) - timedelta(seconds=1)).strftime("%Y-%m") if fim else None
+        meses = []
+        for nome in nomes:
+            encontrado = _PARTICAO.match(nome)
+            if not encontrado:
+                continue
+            mes = encontrado.group(1)
+            if (primeiro is None or mes >= primeiro) and (ultimo is None or mes <= ultimo):
+                meses.append(mes)
+        return sorted(meses)
+
+    # Método para arquivar um empréstimo devolvido; `data_devolucao` está no formato FORMATO_DATA
+    def arquivar(self, emprestimo, data_devolucao):
+        registro = {
+            "id_exemplar": emprestimo.id_exemplar,
+            "usuario_email": emprestimo.usuario_email,
+            "data_emprestimo": emprestimo.data_emprestimo,
+            "data_devolucao": data_devolucao,
+        }
+        linha = json.dumps(registro, separators=(",", ":")) + "\n"
+        mes = registro["data_emprestimo"][:7]
+        with self._lock:
+            arquivo = self._arquivos.get(mes)
+            if arquivo is None:
+                os.makedirs(self.diretorio, exist_ok=True)
+                arquivo = self._arquivos[mes] = open(self.caminho(mes), "a", encoding="utf-8")
+                if arquivo.tell() and not self._termina_em_linha(mes):
+                    arquivo.write("\n")  # Isola o resto de uma gravação interrompida por uma queda
+            try:
+                arquivo.write(linha)  # Uma só escrita por linha: acréscimos de outros processos não se misturam
+                arquivo.flush()  # Entrega ao sistema operacional: sobrevive a uma queda do processo
+                os.fsync(arquivo.fileno())  # E ao disco: a devolução já está no diário, o registro não pode se perder numa queda
+            except OSError:
+                # Disco cheio, permissão...: o arquivo é reaberto na próxima vez, isolando o que ficou pela metade
+                del self._arquivos[mes]
+                try:
+                    arquivo.close()
+                except OSError:
+                    pass
+                raise
+        return registro
+
+    # Método para verificar se a partição termina com uma quebra de linha
+    def _termina_em_linha(self, mes):
+        with open(self.caminho(mes), "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    # Método para percorrer os empréstimos arquivados, sem carregar o arquivo inteiro
+    # `inicio` e `fim` filtram pela data do empréstimo (fim não incluído); os meses fora do período nem são abertos
+    # Dentro de um mês, os registros vêm na ordem das devoluções
+    def consultar(self, inicio=None, fim=None, usuario_email=None, id_exemplar=None):
+        # As datas são convertidas já na chamada, para que uma data inválida falhe antes de qualquer leitura
+        return self._percorrer(texto_data(inicio), texto_data(fim), usuario_email, id_exemplar)
+
+    def _percorrer(self, inicio, fim, usuario_email, id_exemplar):
+        for mes in self.meses(inicio, fim):
+            for registro in ler_particao(self.caminho(mes)):
+                if inicio and registro["data_emprestimo"] < inicio:
+                    continue
+                if fim and registro["data_emprestimo"] >= fim:
+                    continue
+                if usuario_email is not None and registro["usuario_email"] != usuario_email:
+                    continue
+                if id_exemplar is not None and registro["id_exemplar"] != id_exemplar:
+                    continue
+                yield registro
+
+    # Método para contar os empréstimos arquivados de cada usuário no período; retorna {email: quantidade}
+    def por_usuario(self, inicio=None, fim=None):
+        return dict(Counter(registro["usuario_email"] for registro in self.consultar(inicio, fim)))
+
+    # Método para percorrer os empréstimos do período que foram devolvidos depois do prazo (em dias)
+    def atrasados(self, prazo=PRAZO_EMPRESTIMO, inicio=None, fim=None):
+        for registro in self.consultar(inicio, fim):
+            if duracao(registro) > prazo:
+                yield registro
+
+    # Método para exportar os empréstimos do período para um arquivo CSV ou JSON lines (pela extensão)
+    # Os registros são gravados à medida que são lidos; retorna quantos foram exportados
+    def exportar(self, destino, inicio=None, fim=None, usuario_email=None):
+        registros = self.consultar(inicio, fim, usuario_email)
+        quantidade = 0
+        with open(destino, "w", encoding="utf-8", newline="") as f:
+            if destino.lower().endswith(".csv"):
+                escritor = csv.DictWriter(f, fieldnames=CAMPOS)
+                escritor.writeheader()
+                for registro in registros:
+                    escritor.writerow(registro)
+                    quantidade += 1
+            else:
+                for registro in registros:
+                    f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+                    quantidade += 1
+        return quantidade
+
+    # Método para fechar as partições abertas
+    def fechar(self):
+        with self._lock:
+            for arquivo in self._arquivos.values():
+                arquivo.close()
+            self._arquivos = {}
+
+# Uso: python historico.py consultar|por-usuario|atrasados|exportar [destino] [--de DATA] [--ate DATA] [--usuario EMAIL] [--prazo DIAS]
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Consulta o histórico de empréstimos devolvidos")
+    parser.add_argument("comando", choices=["consultar", "por-usuario", "atrasados", "exportar"])
+    parser.add_argument("destino", nargs="?", help="arquivo .csv ou .jsonl (só para exportar)")
+    parser.add_argument("--diretorio", default="historico", help="pasta das partições mensais")
+    parser.add_argument("--de", help="data inicial do empréstimo (AAAA-MM-DD), inclusive")
+    parser.add_argument("--ate", help="data final do empréstimo (AAAA-MM-DD), exclusive")
+    parser.add_argument("--usuario", help="email do usuário")
+    parser.add_argument("--prazo", type=float, default=PRAZO_EMPRESTIMO, help="prazo de devolução em dias")
+    argumentos = parser.parse_args()
+
+    historico = HistoricoEmprestimos(argumentos.diretorio)
+    if argumentos.comando == "consultar":
+        for registro in historico.consultar(argumentos.de, argumentos.ate, argumentos.usuario):
+            print(json.dumps(registro, ensure_ascii=False))
+    elif argumentos.comando == "por-usuario":
+        contagem = historico.por_usuario(argumentos.de, argumentos.ate)
+        for email, quantidade in sorted(contagem.items(), key=lambda item: (-item[1], item[0])):
+            print(f"{quantidade:6d}  {email}")
+    elif argumentos.comando == "atrasados":
+        for registro in historico.atrasados(argumentos.prazo, argumentos.de, argumentos.ate):
+            print(f"Livro ID: {registro['id_exemplar']}, Usuário: {registro['usuario_email']}, "
+                  f"Empréstimo: {registro['data_emprestimo']}, Devolução: {registro['data_devolucao']} ({duracao(registro):.1f} dias)")
+    else:
+        if not argumentos.destino:
+            parser.error("informe o arquivo de destino da exportação")
+        print(f"{historico.exportar(argumentos.destino, argumentos.de, argumentos.ate, argumentos.usuario)} empréstimos exportados")
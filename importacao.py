@@ -0,0 +1,164 @@
+import csv
+import json
+import sys
+import time
+
+from biblioteca import Biblioteca, Livro, Usuario
+from indices import normalizar
+
+# Campos obrigatórios de cada tipo de registro (os mesmos exigidos pelos formulários da interface)
+CAMPOS_LIVRO = ["titulo", "autor", "publicacao", "isbn", "categoria"]
+CAMPOS_USUARIO = ["nome", "email", "tipo"]
+
+# Classe que acumula o resultado de uma importação
+class RelatorioImportacao:
+    def __init__(self):
+        self.aceitos = 0  # Quantidade de registros cadastrados
+        self.rejeitados = []  # Lista de (número da linha, motivo) dos registros recusados
+        self.segundos = 0.0  # Duração total da importação
+
+    # Taxa de registros lidos por segundo
+    @property
+    def registros_por_segundo(self):
+        total = self.aceitos + len(self.rejeitados)
+        return total / self.segundos if self.segundos else 0.0
+
+    def __str__(self):
+        linhas = [f"{self.aceitos} registros aceitos, {len(self.rejeitados)} rejeitados em {self.segundos:.2f}s "
+                  f"({self.registros_por_segundo:.0f} registros/s)"]
+        for linha, motivo in self.rejeitados[:20]:
+            linhas.append(f"  linha {linha}: {motivo}")
+        if len(self.rejeitados) > 20:
+            linhas.append(f"  ... e mais {len(self.rejeitados) - 20} rejeitados")
+        return "\n".join(linhas)
+
+# Função que lê um arquivo CSV ou JSONL registro a registro, sem carregá-lo inteiro na memória
+# Gera pares (número da linha, registro); os nomes dos campos são normalizados ("Título" -> "titulo")
+def ler_registros(caminho, formato=None):
+    if formato is None:
+        formato = "jsonl" if caminho.lower().endswith((".jsonl", ".json")) else "csv"
+    with open(caminho, "r", encoding="utf-8-sig", newline="") as f:
+        if formato == "csv":
+            leitor = csv.DictReader(f)
+            if leitor.fieldnames:
+                leitor.fieldnames = [normalizar(campo).strip() for campo in leitor.fieldnames]  # Cabeçalho normalizado uma vez
+            for registro in leitor:
+                yield leitor.line_num, registro
+        else:
+            for numero, linha in enumerate(f, start=1):
+                if not linha.strip():
+                    continue
+                try:
+                    registro = json.loads(linha)
+                except json.JSONDecodeError:
+                    yield numero, None  # Linha inválida: será rejeitada
+                    continue
+                if not isinstance(registro, dict):
+                    yield numero, None
+                    continue
+                yield numero, {normalizar(campo).strip(): valor for campo, valor in registro.items()}
+
+# Função que valida os campos obrigatórios; retorna os valores limpos ou o motivo da rejeição
+def _validar(registro, campos):
+    if registro is None:
+        return None, "linha mal formada"
+    valores = {}
+    for campo in campos:
+        valor = registro.get(campo)
+        valor = "" if valor is None else str(valor).strip()
+        if not valor:
+            return None, f"campo '{campo}' vazio"
+        valores[campo] = valor
+    return valores, None
+
+# Função que agrupa os registros aceitos em lotes de `tamanho_lote`
+def _em_lotes(registros, tamanho_lote):
+    lote = []
+    for registro in registros:
+        lote.append(registro)
+        if len(lote) >= tamanho_lote:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+# Função que importa livros de um arquivo; cada linha é um título com uma ou mais cópias
+# A coluna opcional "exemplares" indica quantas cópias cadastrar (1 se ausente)
+# Um ISBN que já existe no acervo ou que se repete no arquivo é rejeitado
+def importar_livros(biblioteca, caminho, formato=None, tamanho_lote=5000):
+    relatorio = RelatorioImportacao()
+    inicio = time.perf_counter()
+    isbns_vistos = biblioteca.isbns_cadastrados()  # ISBNs do acervo mais os aceitos nesta importação
+
+    def validos():
+        for numero, registro in ler_registros(caminho, formato):
+            valores, motivo = _validar(registro, CAMPOS_LIVRO)
+            if valores is None:
+                relatorio.rejeitados.append((numero, motivo))
+                continue
+            isbn = valores["isbn"]
+            if isbn in isbns_vistos:
+                relatorio.rejeitados.append((numero, f"ISBN {isbn} já cadastrado"))
+                continue
+            exemplares = registro.get("exemplares")
+            try:
+                exemplares = 1 if exemplares in (None, "") else int(exemplares)
+            except (TypeError, ValueError):
+                exemplares = 0
+            if exemplares < 1:
+                relatorio.rejeitados.append((numero, "quantidade de exemplares inválida"))
+                continue
+            isbns_vistos.add(isbn)
+            for _ in range(exemplares):
+                # O id_exemplar fica em aberto: a biblioteca reserva a faixa inteira do lote de uma vez
+                yield Livro(valores["titulo"], valores["autor"], valores["publicacao"], isbn, valores["categoria"], None)
+
+    for lote in _em_lotes(validos(), tamanho_lote):
+        biblioteca.cadastra_livros(lote)  # Uma gravação por lote
+        relatorio.aceitos += len(lote)
+    relatorio.segundos = time.perf_counter() - inicio
+    return relatorio
+
+# Função que importa usuários de um arquivo; emails já cadastrados ou repetidos no arquivo são rejeitados
+def importar_usuarios(biblioteca, caminho, formato=None, tamanho_lote=5000):
+    relatorio = RelatorioImportacao()
+    inicio = time.perf_counter()
+    emails_vistos = biblioteca.emails_cadastrados()  # Emails já cadastrados mais os aceitos nesta importação
+
+    def validos():
+        for numero, registro in ler_registros(caminho, formato):
+            valores, motivo = _validar(registro, CAMPOS_USUARIO)
+            if valores is None:
+                relatorio.rejeitados.append((numero, motivo))
+                continue
+            email = valores["email"]
+            if email in emails_vistos:
+                relatorio.rejeitados.append((numero, f"e-mail {email} já cadastrado"))
+                continue
+            emails_vistos.add(email)
+            yield Usuario(valores["nome"], email, valores["tipo"])
+
+    for lote in _em_lotes(validos(), tamanho_lote):
+        biblioteca.cadastra_usuarios(lote)  # Uma gravação por lote
+        relatorio.aceitos += len(lote)
+    relatorio.segundos = time.perf_counter() - inicio
+    return relatorio
+
+# Uso: python importacao.py livros|usuarios arquivo.csv|arquivo.jsonl [--lote N]
+if __name__ == "__main__":
+    argumentos = sys.argv[1:]
+    tamanho_lote = 5000
+    if "--lote" in argumentos:
+        posicao = argumentos.index("--lote")
+        tamanho_lote = int(argumentos[posicao + 1])
+        del argumentos[posicao:posicao + 2]
+    if len(argumentos) != 2 or argumentos[0] not in ("livros", "usuarios"):
+        print("Uso: python importacao.py livros|usuarios arquivo.csv|arquivo.jsonl [--lote N]")
+        sys.exit(2)
+
+    biblioteca = Biblioteca()
+    try:
+        importar = importar_livros if argumentos[0] == "livros" else importar_usuarios
+        print(importar(biblioteca, argumentos[1], tamanho_lote=tamanho_lote))
+    finally:
+        biblioteca.fechar()
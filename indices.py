@@ -0,0 +1,249 @@
+import bisect
+import difflib
+import functools
+import heapq
+import unicodedata
+from collections import Counter
+
+import diagnostico
+
+# Função que normaliza um texto para comparação: minúsculo e sem acentos
+def normalizar(texto):
+    decomposto = unicodedata.normalize("NFKD", texto)
+    return "".join(c for c in decomposto if not unicodedata.combining(c)).casefold()
+
+# Funções que montam as tabelas de bytes.translate na primeira vez que cada uma é usada (e as guardam)
+# _limites(n)[v] == min(v, n)
+@functools.cache
+def _limites(n):
+    return bytes(min(valor, n) for valor in range(256))
+
+# _alcanca(n)[v] == 1 se v >= n (senão 0)
+@functools.cache
+def _alcanca(n):
+    return bytes(int(valor >= n) for valor in range(256))
+
+# Classe que mantém um índice invertido de trigramas para a busca aproximada por título
+# Títulos iguais (vários exemplares do mesmo livro) são guardados e pontuados uma única vez
+# Para cada tamanho de texto, guarda também quantas vezes cada caractere aparece em cada texto; com isso a busca
+# calcula de uma vez o limite superior do ratio() do difflib (o quick_ratio) de todos os textos e nunca descarta
+# um texto que poderia entrar no resultado
+class IndiceTrigramas:
+    def __init__(self):
+        self._textos = []  # Textos distintos já normalizados (minúsculos)
+        self._chaves = []  # Para cada texto, a lista de chaves (id_exemplar) que o possuem
+        self._quantidades = []  # Para cada texto, quantos trigramas distintos ele tem
+        self._posicoes = {}  # Texto normalizado -> posição nas listas acima
+        self._postagens = {}  # Trigrama -> lista de posições dos textos que o contêm
+        # Tamanho do texto -> (posições dos textos com esse tamanho, {caractere: bytearray com a contagem em cada um})
+        self._tamanhos = {}
+
+    # Método para gerar os trigramas de um texto; os espaços nas bordas marcam início e fim de palavra
+    @staticmethod
+    def trigramas(texto):
+        texto = f"  {texto} "
+        return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+    # Método para incluir uma chave no índice com o texto informado
+    def adicionar(self, chave, texto):
+        texto = texto.lower()
+        posicao = self._posicoes.get(texto)
+        if posicao is None:
+            # Texto novo: registra nas postagens de cada trigrama e nas contagens de caracteres do seu tamanho
+            posicao = len(self._textos)
+            self._posicoes[texto] = posicao
+            self._textos.append(texto)
+            self._chaves.append([])
+            trigramas = self.trigramas(texto)
+            self._quantidades.append(len(trigramas))
+            for trigrama in trigramas:
+                self._postagens.setdefault(trigrama, []).append(posicao)
+            posicoes, contagens = self._tamanhos.setdefault(len(texto), ([], {}))
+            indice = len(posicoes)
+            posicoes.append(posicao)
+            for caractere in set(texto):
+                coluna = contagens.setdefault(caractere, bytearray())
+                if len(coluna) < indice:
+                    coluna.extend(bytes(indice - len(coluna)))  # Os textos anteriores não têm o caractere
+                coluna.append(min(texto.count(caractere), 255))
+        self._chaves[posicao].append(chave)
+
+    # Método para listar os textos que mais compartilham trigramas com a consulta (maior coeficiente de Dice)
+    def _candidatos(self, consulta, quantidade):
+        trigramas = self.trigramas(consulta)
+        contagem = Counter()
+        for trigrama in trigramas:
+            contagem.update(self._postagens.get(trigrama, ()))
+        if len(contagem) <= quantidade:
+            return contagem
+        quantidades = self._quantidades
+        total = len(trigramas)
+        return heapq.nlargest(quantidade, contagem, key=lambda posicao: contagem[posicao] / (total + quantidades[posicao]))
+
+    # Método para calcular quantos caracteres, no máximo, cada texto de um tamanho tem em comum com a consulta
+    # (a soma, caractere a caractere, da menor das duas contagens); retorna um byte por texto, na ordem do grupo
+    # As colunas são somadas como inteiros grandes, um byte por texto: o trabalho todo é feito em C
+    @staticmethod
+    def _em_comum(contagens, quantidade_textos, caracteres):
+        soma = 0
+        for caractere, quantidade in caracteres.items():
+            coluna = contagens.get(caractere)
+            if coluna is None:
+                continue
+            if len(coluna) < quantidade_textos:
+                coluna.extend(bytes(quantidade_textos - len(coluna)))
+            soma += int.from_bytes(coluna.translate(_limites(min(quantidade, 255))), "little")
+        return soma.to_bytes(quantidade_textos, "little")
+
+    # Método para buscar as chaves cujo texto tem similaridade (difflib) de pelo menos `minimo` com a consulta
+    # Retorna no máximo `maximo` chaves (todas, se `maximo` for None), da mais parecida para a menos parecida e, no
+    # empate, na ordem das chaves: o mesmo resultado de comparar a consulta com todos os textos, sem comparar todos
+    # 1. os `candidatos_por_resultado * maximo` textos com mais trigramas em comum são comparados primeiro; isso já
+    #    encontra quase todos os resultados e eleva a similaridade necessária para entrar entre os `maximo` melhores
+    # 2. nos demais, só chegam ao ratio() (a parte cara) os textos cujo limite superior, calculado pelos caracteres
+    #    em comum e pelo tamanho, ainda alcança essa similaridade
+    def buscar(self, consulta, minimo=0.3, maximo=50, candidatos_por_resultado=4):
+        if maximo is not None and maximo <= 0:
+            return []  # Nenhum resultado pedido
+        consulta = consulta.lower()
+        tamanho = len(consulta)
+        comparador = difflib.SequenceMatcher(None, consulta)
+        melhores = []  # Heap de (similaridade, -menor chave, posição) com os melhores textos até agora
+        comparados = set()  # Posições que já passaram pelo ratio()
+
+        # Similaridade que um texto precisa alcançar para entrar no resultado
+        def necessaria():
+            return melhores[0][0] if maximo is not None and len(melhores) >= maximo else minimo
+
+        def comparar(posicao):
+            comparados.add(posicao)
+            comparador.set_seq2(self._textos[posicao])
+            similaridade = comparador.ratio()
+            if similaridade < minimo:
+                return
+            item = (similaridade, -min(self._chaves[posicao]), posicao)  # No empate, vence a menor chave
+            if maximo is None or len(melhores) < maximo:
+                heapq.heappush(melhores, item)
+            elif item > melhores[0]:
+                heapq.heapreplace(melhores, item)
+
+        if maximo is not None and tamanho >= 4:
+            for posicao in self._candidatos(consulta, maximo * candidatos_por_resultado):
+                comparar(posicao)
+
+        # Os tamanhos de texto são visitados do maior para o menor limite pelo tamanho, 2 * min(a, b) / (a + b)
+        caracteres = Counter(consulta)
+        limite_tamanho = lambda t: 2.0 * min(tamanho, t) / (tamanho + t) if tamanho + t else 1.0
+        percorridos = 0
+        for tamanho_texto in sorted(self._tamanhos, key=limite_tamanho, reverse=True):
+            if limite_tamanho(tamanho_texto) < necessaria():
+                break  # Nenhum texto deste tamanho (nem dos seguintes) alcança a similaridade necessária
+            posicoes, contagens = self._tamanhos[tamanho_texto]
+            total = tamanho + tamanho_texto
+            if tamanho_texto > 255:
+                # Contagens acima de 255 não cabem num byte: os textos muito longos são todos comparados
+                for posicao in posicoes:
+                    if posicao not in comparados:
+                        comparar(posicao)
+                continue
+            # Com `comum` caracteres em comum, a similaridade é no máximo 2 * comum / total
+            em_comum = self._em_comum(contagens, len(posicoes), caracteres)
+            necessarios = 0
+            while 2.0 * necessarios / total < necessaria():
+                necessarios += 1  # Menor quantidade de caracteres em comum que ainda alcança a similaridade
+            alcancam = em_comum.translate(_alcanca(min(necessarios, 256)))
+            indice = alcancam.find(1)
+            while indice != -1:
+                percorridos += 1
+                posicao = posicoes[indice]
+                # A similaridade necessária pode ter subido depois de calculado o grupo
+                if posicao not in comparados and 2.0 * em_comum[indice] / total >= necessaria():
+                    comparar(posicao)
+                indice = alcancam.find(1, indice + 1)
+
+        diagnostico.contar("títulos candidatos", percorridos)
+        diagnostico.contar("títulos comparados (difflib)", len(comparados))
+
+        # Cada chave fica com a similaridade do seu texto; no empate, vale a ordem das chaves
+        resultados = sorted(((similaridade, chave) for similaridade, _, posicao in melhores for chave in self._chaves[posicao]),
+                            key=lambda item: (-item[0], item[1]))
+        return [chave for _, chave in resultados[:maximo]]
+
+# Classe que indexa um campo de texto (autor, categoria) para buscas por trecho sem percorrer o acervo
+# Os valores distintos ficam normalizados, e seus sufixos numa lista ordenada: um trecho buscado é o prefixo
+# de algum sufixo, então basta uma busca binária
+class IndiceTextual:
+    def __init__(self):
+        self._chaves = []  # Para cada valor distinto, a lista de chaves (id_exemplar) que o possuem
+        self._posicoes = {}  # Valor normalizado -> posição em _chaves
+        self._sufixos = []  # Lista ordenada de (sufixo, posição do valor)
+        self._novos_sufixos = []  # Sufixos ainda não incorporados à lista ordenada
+
+    # Método para incluir uma chave no índice com o valor informado
+    def adicionar(self, chave, valor):
+        valor = normalizar(valor)
+        posicao = self._posicoes.get(valor)
+        if posicao is None:
+            posicao = len(self._chaves)
+            self._posicoes[valor] = posicao
+            self._chaves.append([])
+            self._novos_sufixos.extend((valor[i:], posicao) for i in range(len(valor)))
+        self._chaves[posicao].append(chave)
+
+    # Método para incorporar os sufixos novos à lista ordenada (feito só quando alguém busca)
+    def _ordenar(self):
+        if self._novos_sufixos:
+            self._sufixos.extend(self._novos_sufixos)
+            self._sufixos.sort()  # A parte antiga já está ordenada, então a ordenação é quase linear
+            self._novos_sufixos = []
+
+    # Método para obter o conjunto de chaves cujo valor contém o trecho buscado
+    def buscar(self, trecho):
+        trecho = normalizar(trecho)
+        if not trecho:
+            return {chave for chaves in self._chaves for chave in chaves}  # Trecho vazio casa com tudo
+        self._ordenar()
+        posicoes = set()
+        i = bisect.bisect_left(self._sufixos, (trecho,))
+        inicio = i
+        while i < len(self._sufixos) and self._sufixos[i][0].startswith(trecho):
+            posicoes.add(self._sufixos[i][1])
+            i += 1
+        diagnostico.contar("sufixos percorridos", i - inicio)
+        return {chave for posicao in posicoes for chave in self._chaves[posicao]}
+
+# Classe que mantém os IDs ordenados por uma chave (uma coluna da listagem), atualizada a cada alteração
+# Permite pegar qualquer página da listagem ordenada sem reordenar o acervo
+class IndiceOrdenado:
+    def __init__(self, pares=()):
+        self._itens = sorted(pares)  # Lista ordenada de (chave, id)
+
+    def __len__(self):
+        return len(self._itens)
+
+    # Método para incluir um ID com a sua chave de ordenação
+    def adicionar(self, chave, identificador):
+        bisect.insort(self._itens, (chave, identificador))
+
+    # Método para retirar um ID (a chave precisa ser a mesma usada ao incluir)
+    def remover(self, chave, identificador):
+        i = bisect.bisect_left(self._itens, (chave, identificador))
+        if i < len(self._itens) and self._itens[i] == (chave, identificador):
+            del self._itens[i]
+
+    # Método para obter, em ordem, os IDs com chave menor que `limite`
+    def antes_de(self, limite):
+        fim = bisect.bisect_left(self._itens, (limite,))  # (limite,) vem antes de qualquer (limite, id)
+        return [identificador for _, identificador in self._itens[:fim]]
+
+    # Método para obter os IDs de uma página, em ordem crescente ou decrescente
+    def fatia(self, inicio, quantidade, decrescente=False):
+        if quantidade <= 0:
+            return []  # Uma quantidade negativa cortaria a lista pelo fim
+        if decrescente:
+            fim = len(self._itens) - inicio
+            itens = self._itens[max(0, fim - quantidade):max(0, fim)]
+            itens.reverse()
+        else:
+            itens = self._itens[inicio:inicio + quantidade]
+        return [identificador for _, identificador in itens]
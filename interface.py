@@ -0,0 +1,570 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import queue
+import threading
+import tkinter as tk
+from tkinter import messagebox
+from tkinter import ttk
+
+from biblioteca import Biblioteca, ErroBiblioteca, Livro, Usuario
+import diagnostico
+
+# Classe que representa a janela de listagem de livros, que mostra uma página por vez
+class JanelaLivros:
+    # Colunas da árvore: (identificador, cabeçalho, campo do livro, largura, alinhamento)
+    colunas = [
+        ("ID", "ID Exemplar", "id_exemplar", 80, "center"),
+        ("Título", "Título", "titulo", 150, "w"),
+        ("Autor", "Autor", "autor", 120, "w"),
+        ("Publicação", "Publicação", "publicacao", 80, "center"),
+        ("ISBN", "ISBN", "isbn", 100, "center"),
+        ("Categoria", "Categoria", "categoria", 100, "center"),
+        ("Emprestado", "Emprestado", "emprestado", 80, "center"),
+        ("Empréstimos", "Empréstimos", "emprestimos_count", 100, "center"),
+    ]
+
+    # `primeira` é a primeira página já buscada pela aplicação, (total, livros), exibida sem nova busca
+    def __init__(self, app, primeira=None):
+        self.app = app  # Aplicação que busca (e guarda em cache) as páginas
+        self.pagina = 0  # Página exibida
+        self._pedido = 0  # Número da última página pedida; respostas de pedidos mais antigos são ignoradas
+        self.coluna = None  # Campo usado na ordenação (None = ordem de cadastro)
+        self.decrescente = False  # Indica se a ordenação é decrescente
+        self.filtro = None  # Par (critério, valor) aplicado à listagem
+
+        # Cria uma nova janela para exibir a lista de livros
+        self.janela = tk.Toplevel(app.root)
+        self.janela.title("Todos os Livros")  # Define o título da nova janela
+        self.janela.geometry("750x400")  # Define o tamanho da nova janela
+
+        # Cria a barra de filtro
+        filtro_frame = ttk.Frame(self.janela)
+        filtro_frame.pack(fill="x", padx=10, pady=(10, 0))
+        self.criterio_var = tk.StringVar(value="título")  # Critério do filtro
+        ttk.Combobox(filtro_frame, textvariable=self.criterio_var, state="readonly", values=["título", "autor", "categoria"], width=12).pack(side="left")
+        self.valor_var = tk.StringVar()  # Valor do filtro
+        ttk.Entry(filtro_frame, textvariable=self.valor_var).pack(side="left", expand=True, fill="x", padx=5)
+        ttk.Button(filtro_frame, text="Filtrar", command=self.filtrar).pack(side="left")
+        ttk.Button(filtro_frame, text="Limpar", command=self.limpar_filtro).pack(side="left", padx=(5, 0))
+
+        # Cria uma árvore para exibir os detalhes dos livros; clicar no cabeçalho ordena pela coluna
+        self.tree = ttk.Treeview(self.janela, columns=[coluna[0] for coluna in self.colunas], show="headings")
+        for identificador, cabecalho, campo, largura, alinhamento in self.colunas:
+            self.tree.heading(identificador, text=cabecalho, command=lambda c=campo: self.ordenar(c))
+            self.tree.column(identificador, width=largura, anchor=alinhamento)
+        self.tree.pack(expand=True, fill="both", padx=10, pady=10)  # Adiciona a árvore à janela
+
+        # Cria a barra de navegação entre as páginas
+        navegacao = ttk.Frame(self.janela)
+        navegacao.pack(fill="x", padx=10, pady=(0, 10))
+        self.btn_anterior = ttk.Button(navegacao, text="< Anterior", command=lambda: self.ir_para(self.pagina - 1))
+        self.btn_anterior.pack(side="left")
+        self.btn_proxima = ttk.Button(navegacao, text="Próxima >", command=lambda: self.ir_para(self.pagina + 1))
+        self.btn_proxima.pack(side="right")
+        self.pagina_lbl = ttk.Label(navegacao, anchor="center")
+        self.pagina_lbl.pack(side="left", expand=True, fill="x")
+
+        if primeira is None:
+            self.mostrar()
+        else:
+            self._exibir(self._pedido, primeira)
+
+    # Método para pedir a página atual; a busca roda numa thread de leitura e a árvore é preenchida ao concluir
+    def mostrar(self):
+        self._pedido += 1
+        pedido = self._pedido
+        self.pagina_lbl.config(text="Carregando...")
+        self.app.executar(self.app.buscar_pagina, self.pagina, self.coluna, self.decrescente, self.filtro,
+                          ao_concluir=lambda resultado: self._exibir(pedido, resultado), descricao="Carregando livros...")
+
+    # Método para exibir uma página buscada; só as linhas da página são criadas na árvore
+    def _exibir(self, pedido, resultado):
+        if pedido != self._pedido or not self.janela.winfo_exists():
+            return  # Página substituída por outra mais nova ou janela já fechada
+        total, livros = resultado
+        paginas = max(1, -(-total // self.app.TAMANHO_PAGINA))  # Divisão arredondada para cima
+        with diagnostico.cronometro("JanelaLivros.preencher_arvore"):
+            self.tree.delete(*self.tree.get_children())  # Remove as linhas da página anterior
+            # Insere os livros na árvore
+            for livro in livros:
+                emprestado = "Sim" if livro["emprestado"] else "Não"  # Verifica se o livro está emprestado
+                self.tree.insert("", "end", values=(livro["id_exemplar"], livro["titulo"], livro["autor"], livro["publicacao"], livro["isbn"], livro["categoria"], emprestado, livro["emprestimos_count"]))
+            diagnostico.contar("linhas na árvore", len(livros))
+        self.pagina_lbl.config(text=f"Página {self.pagina + 1} de {paginas} ({total} livros)")
+        self.btn_anterior.state(["!disabled"] if self.pagina > 0 else ["disabled"])
+        self.btn_proxima.state(["!disabled"] if self.pagina + 1 < paginas else ["disabled"])
+
+    # Método para mudar de página
+    def ir_para(self, pagina):
+        self.pagina = max(0, pagina)
+        self.mostrar()
+
+    # Método para ordenar pela coluna clicada; clicar de novo inverte a ordem
+    def ordenar(self, campo):
+        if self.coluna == campo:
+            self.decrescente = not self.decrescente
+        else:
+            self.coluna, self.decrescente = campo, False
+        self.ir_para(0)
+
+    # Método para aplicar o filtro digitado
+    def filtrar(self):
+        valor = self.valor_var.get().strip()
+        self.filtro = (self.criterio_var.get(), valor) if valor else None
+        self.ir_para(0)
+
+    # Método para remover o filtro
+    def limpar_filtro(self):
+        self.valor_var.set("")
+        self.filtrar()
+
+# Classe que representa a interface gráfica da biblioteca
+class BibliotecaApp:
+    TAMANHO_PAGINA = 100  # Quantidade de livros por página na listagem
+    PAGINAS_EM_CACHE = 50  # Quantidade de páginas guardadas para reabrir a listagem sem buscar de novo
+    INTERVALO_FILA = 50  # Intervalo (ms) em que a interface recolhe os resultados das threads
+
+    def __init__(self, root, biblioteca=None):
+        self.biblioteca = biblioteca or Biblioteca()  # Usa a biblioteca recebida ou cria uma com os arquivos JSON
+        self.root = root  # Armazena a referência da janela principal
+        self.root.title("Sistema de Biblioteca")  # Define o título da janela
+        self.root.geometry("800x650")  # Define o tamanho da janela
+        self.style = ttk.Style()  # Cria um estilo para a interface
+        self.style.theme_use("clam")  # Define o tema da interface
+        self._cache_paginas = OrderedDict()  # Páginas da listagem já buscadas, da menos para a mais recente
+        self._lock_paginas = threading.Lock()  # Protege o cache: as páginas são buscadas pelas threads de leitura
+
+        # Leitura e gravação rodam fora da thread da interface; as gravações numa única thread, em ordem
+        self._escrita = ThreadPoolExecutor(max_workers=1, thread_name_prefix="biblioteca-escrita")
+        self._leitura = ThreadPoolExecutor(max_workers=2, thread_name_prefix="biblioteca-leitura")
+        self._fila = queue.Queue()  # Chamadas que as threads pedem para executar na thread da interface
+        self._em_andamento = 0  # Quantidade de tarefas ainda não concluídas
+        self._busca = None  # Última busca enviada (as anteriores são canceladas)
+        self._geracao_busca = 0  # Número da última busca; resultados de buscas mais antigas são ignorados
+        self.root.protocol("WM_DELETE_WINDOW", self.fechar)
+
+        # Cria a barra de status com a indicação de progresso
+        status_frame = ttk.Frame(root)
+        status_frame.pack(side="bottom", fill="x", padx=10, pady=(0, 10))
+        self.status_lbl = ttk.Label(status_frame, text="Pronto")
+        self.status_lbl.pack(side="left")
+        self.progresso = ttk.Progressbar(status_frame, mode="indeterminate", length=150)
+        self.progresso.pack(side="right")
+        self.root.after(self.INTERVALO_FILA, self._processar_fila)
+        
+        # Cria um notebook para organizar as abas da interface
+        notebook = ttk.Notebook(root)
+        notebook.pack(expand=True, fill="both", padx=10, pady=10)
+        
+        # Cria a aba para livros
+        self.frame_livros = ttk.Frame(notebook)
+        notebook.add(self.frame_livros, text="Livros")
+        self.create_livros_tab()  # Chama o método para criar a aba de livros
+        
+        # Cria a aba para usuários
+        self.frame_usuarios = ttk.Frame(notebook)
+        notebook.add(self.frame_usuarios, text="Usuários")
+        self.create_usuarios_tab()  # Chama o método para criar a aba de usuários
+        
+        # Cria a aba para empréstimos
+        self.frame_emprestimos = ttk.Frame(notebook)
+        notebook.add(self.frame_emprestimos, text="Empréstimos")
+        self.create_emprestimos_tab()  # Chama o método para criar a aba de empréstimos
+        
+        # Cria a aba para relatórios
+        self.frame_relatorios = ttk.Frame(notebook)
+        notebook.add(self.frame_relatorios, text="Relatórios")
+        self.create_relatorios_tab()  # Chama o método para criar a aba de relatórios
+
+        # Cria a aba de diagnóstico (tempos e contadores das operações)
+        self.frame_diagnostico = ttk.Frame(notebook)
+        notebook.add(self.frame_diagnostico, text="Diagnóstico")
+        self.create_diagnostico_tab()  # Chama o método para criar a aba de diagnóstico
+
+    # Método para pedir que uma função seja executada na thread da interface
+    def na_interface(self, funcao, *args):
+        self._fila.put((funcao, args))
+
+    # Método que executa, na thread da interface, as chamadas enviadas pelas threads
+    def _processar_fila(self):
+        try:
+            while True:
+                try:
+                    funcao, args = self._fila.get_nowait()
+                except queue.Empty:
+                    break
+                funcao(*args)
+        finally:
+            self.root.after(self.INTERVALO_FILA, self._processar_fila)  # Continua recolhendo mesmo se uma chamada falhar
+
+    # Método para executar uma tarefa numa thread; `ao_concluir` recebe o resultado na thread da interface
+    def executar(self, funcao, *args, ao_concluir=None, descricao="Processando...", escrita=False):
+        executor = self._escrita if escrita else self._leitura
+        self._em_andamento += 1
+        self.status_lbl.config(text=descricao)
+        self.progresso.start(10)
+        futuro = executor.submit(funcao, *args)
+        futuro.add_done_callback(lambda f: self.na_interface(self._concluir, f, ao_concluir))
+        return futuro
+
+    # Método chamado na thread da interface quando uma tarefa termina (ou é cancelada)
+    def _concluir(self, futuro, ao_concluir):
+        self._em_andamento -= 1
+        if not self._em_andamento:
+            self.progresso.stop()
+            self.status_lbl.config(text="Pronto")
+        if futuro.cancelled():
+            return
+        erro = futuro.exception()
+        if isinstance(erro, ErroBiblioteca):
+            messagebox.showerror("Erro", str(erro))  # Regra da biblioteca violada (livro indisponível, usuário inexistente...)
+        elif erro is not None:
+            messagebox.showerror("Erro", f"Falha ao acessar os dados: {erro}")  # Exibe mensagem de erro
+        elif ao_concluir is not None:
+            ao_concluir(futuro.result())
+
+    # Método para fechar a aplicação depois que as gravações pendentes terminarem
+    def fechar(self):
+        self._leitura.shutdown(wait=False, cancel_futures=True)
+        self._escrita.shutdown(wait=True)
+        self.root.destroy()
+
+    # Método para criar a aba de livros
+    def create_livros_tab(self):
+        frame = self.frame_livros
+        title_lbl = ttk.Label(frame, text="Cadastro e Listagem de Livros", font=("Helvetica", 18, "bold"))
+        title_lbl.pack(pady=10)  # Adiciona o título da aba
+
+        # Cria um frame para cadastro de livros
+        cadastro_frame = ttk.LabelFrame(frame, text="Cadastrar Livro")
+        cadastro_frame.pack(fill="x", padx=20, pady=10)
+        campos = ["Título", "Autor", "Publicação", "ISBN", "Categoria"]  # Campos para cadastro
+        self.livro_vars = {}  # Dicionário para armazenar as variáveis dos campos
+        for campo in campos:
+            frame_campo = ttk.Frame(cadastro_frame)
+            frame_campo.pack(fill="x", padx=10, pady=5)
+            lbl_campo = ttk.Label(frame_campo, text=campo + ":", width=15, anchor="w")
+            lbl_campo.pack(side="left")  # Adiciona o rótulo do campo
+            var = tk.StringVar()  # Cria uma variável para armazenar o valor do campo
+            entry = ttk.Entry(frame_campo, textvariable=var)  # Cria um campo de entrada
+            entry.pack(side="left", expand=True, fill="x")  # Adiciona o campo de entrada
+            self.livro_vars[campo.lower()] = var  # Armazena a variável no dicionário
+        btn_cadastrar = ttk.Button(cadastro_frame, text="Cadastrar Livro", command=self.cadastrar_livro)
+        btn_cadastrar.pack(pady=10)  # Adiciona o botão de cadastro
+
+        # Cria um frame para busca de livros
+        busca_frame = ttk.LabelFrame(frame, text="Buscar Livro")
+        busca_frame.pack(fill="x", padx=20, pady=10)
+        criterio_lbl = ttk.Label(busca_frame, text="Critério:", width=15, anchor="w")
+        criterio_lbl.grid(row=0, column=0, padx=5, pady=5)  # Adiciona o rótulo do critério
+        self.criterio_var = tk.StringVar()  # Variável para armazenar o critério de busca
+        self.criterio_combobox = ttk.Combobox(busca_frame, textvariable=self.criterio_var, state="readonly", values=["título", "autor", "categoria"])
+        self.criterio_combobox.grid(row=0, column=1, padx=5, pady=5)  # Adiciona a combobox para selecionar o critério
+        self.criterio_combobox.current(0)  # Define o critério padrão
+        valor_lbl = ttk.Label(busca_frame, text="Valor:", width=15, anchor="w")
+        valor_lbl.grid(row=1, column=0, padx=5, pady=5)  # Adiciona o rótulo do valor
+        self.valor_busca = tk.StringVar()  # Variável para armazenar o valor de busca
+        entry_valor = ttk.Entry(busca_frame, textvariable=self.valor_busca)  # Cria um campo de entrada para o valor
+        entry_valor.grid(row=1, column=1, padx=5, pady=5)  # Adiciona o campo de entrada
+        btn_busca = ttk.Button(busca_frame, text="Buscar", command=self.buscar_livro)
+        btn_busca.grid(row=2, column=0, columnspan=2, pady=10)  # Adiciona o botão de busca
+        
+        btn_listar = ttk.Button(frame, text="Listar Todos os Livros", command=self.listar_todos_livros)
+        btn_listar.pack(pady=10)  # Adiciona o botão para listar todos os livros
+
+    # Método para criar a aba de usuários
+    def create_usuarios_tab(self):
+        frame = self.frame_usuarios
+        title_lbl = ttk.Label(frame, text="Cadastro de Usuários", font=("Helvetica", 18, "bold"))
+        title_lbl.pack(pady=10)  # Adiciona o título da aba
+        cadastro_frame = ttk.LabelFrame(frame, text="Cadastrar Usuário")
+        cadastro_frame.pack(fill="x", padx=20, pady=10)  # Cria um frame para cadastro de usuários
+        campos = ["Nome", "Email", "Tipo"]  # Campos para cadastro
+        self.usuario_vars = {}  # Dicionário para armazenar as variáveis dos campos
+        for campo in campos:
+            frame_campo = ttk.Frame(cadastro_frame)
+            frame_campo.pack(fill="x", padx=10, pady=5)
+            lbl_campo = ttk.Label(frame_campo, text=campo + ":", width=15, anchor="w")
+            lbl_campo.pack(side="left")  # Adiciona o rótulo do campo
+            var = tk.StringVar()  # Cria uma variável para armazenar o valor do campo
+            entry = ttk.Entry(frame_campo, textvariable=var)  # Cria um campo de entrada
+            entry.pack(side="left", expand=True, fill="x")  # Adiciona o campo de entrada
+            self.usuario_vars[campo.lower()] = var  # Armazena a variável no dicionário
+        btn_cadastrar = ttk.Button(cadastro_frame, text="Cadastrar Usuário", command=self.cadastrar_usuario)
+        btn_cadastrar.pack(pady=10)  # Adiciona o botão de cadastro
+
+    # Método para criar a aba de empréstimos
+    def create_emprestimos_tab(self):
+        frame = self.frame_emprestimos
+        title_lbl = ttk.Label(frame, text="Gerenciar Empréstimos", font=("Helvetica", 18, "bold"))
+        title_lbl.pack(pady=10)  
+        emprestimo_frame = ttk.LabelFrame(frame, text="Realizar Empréstimo")
+        emprestimo_frame.pack(fill="x", padx=20, pady=10)  # Cria um frame para realizar empréstimos
+        lbl_id = ttk.Label(emprestimo_frame, text="ID Exemplar:", width=15, anchor="w")
+        lbl_id.grid(row=0, column=0, padx=5, pady=5)  # Adiciona o rótulo do ID do exemplar
+        self.emprestimo_id = tk.StringVar()  # Variável para armazenar o ID do exemplar
+        entry_id = ttk.Entry(emprestimo_frame, textvariable=self.emprestimo_id)  # Cria um campo de entrada para o ID
+        entry_id.grid(row=0, column=1, padx=5, pady=5)  # Adiciona o campo de entrada
+        lbl_email = ttk.Label(emprestimo_frame, text="Email Usuário:", width=15, anchor="w")
+        lbl_email.grid(row=1, column=0, padx=5, pady=5)  # Adiciona o rótulo do email do usuário
+        self.emprestimo_email = tk.StringVar()  # Variável para armazenar o email do usuário
+        entry_email = ttk.Entry(emprestimo_frame, textvariable=self.emprestimo_email)  # Cria um campo de entrada para o email
+        entry_email.grid(row=1, column=1, padx=5, pady=5)  # Adiciona o campo de entrada
+        btn_emp = ttk.Button(emprestimo_frame, text="Realizar Empréstimo", command=self.realizar_emprestimo)
+        btn_emp.grid(row=2, column=0, columnspan=2, pady=10)  # Adiciona o botão para realizar o empréstimo
+        devolucao_frame = ttk.LabelFrame(frame, text="Devolver Livro")
+        devolucao_frame.pack(fill="x", padx=20, pady=10)  # Cria um frame para devolver livros
+        lbl_devolve = ttk.Label(devolucao_frame, text="ID Exemplar:", width=15, anchor="w")
+        lbl_devolve.grid(row=0, column=0, padx=5, pady=5)  # Adiciona o rótulo do ID do exemplar
+        self.devolve_id = tk.StringVar()  # Variável para armazenar o ID do exemplar a ser devolvido
+        entry_devolve = ttk.Entry(devolucao_frame, textvariable=self.devolve_id)  # Cria um campo de entrada para o ID
+        entry_devolve.grid(row=0, column=1, padx=5, pady=5)  # Adiciona o campo de entrada
+        btn_dev = ttk.Button(devolucao_frame, text="Devolver Livro", command=self.devolver_livro)
+        btn_dev.grid(row=1, column=0, columnspan=2, pady=10)  # Adiciona o botão para devolver o livro
+        btn_lista = ttk.Button(frame, text="Listar Empréstimos", command=self.listar_emprestimos)
+        btn_lista.pack(pady=10)  # Adiciona o botão para listar empréstimos
+
+    # Método para criar a aba de relatórios
+    def create_relatorios_tab(self):
+        frame = self.frame_relatorios
+        title_lbl = ttk.Label(frame, text="Relatórios", font=("Helvetica", 18, "bold"))
+        title_lbl.pack(pady=10)  
+        btn_categoria = ttk.Button(frame, text="Quantidade de Livros por Categoria", command=self.relatorio_categorias)
+        btn_categoria.pack(pady=10, padx=20, fill="x")  
+        btn_emprestimos = ttk.Button(frame, text="Empréstimos por Tipo de Usuário", command=self.relatorio_tipos_usuario)
+        btn_emprestimos.pack(pady=10, padx=20, fill="x")  
+        btn_mais_emprestados = ttk.Button(frame, text="Livros Mais Emprestados", command=self.relatorio_mais_emprestados)
+        btn_mais_emprestados.pack(pady=10, padx=20, fill="x")  
+        btn_atrasados = ttk.Button(frame, text="Empréstimos Atrasados", command=self.relatorio_atrasados)
+        btn_atrasados.pack(pady=10, padx=20, fill="x")
+
+    # Método para criar a aba de diagnóstico, que mostra as operações mais lentas e os contadores
+    def create_diagnostico_tab(self):
+        frame = self.frame_diagnostico
+        botoes = ttk.Frame(frame)
+        botoes.pack(fill="x", padx=10, pady=10)
+        self.diagnostico_var = tk.BooleanVar(value=diagnostico.ATIVO)  # Liga ou desliga a medição sem reiniciar
+        ttk.Checkbutton(botoes, text="Medir operações", variable=self.diagnostico_var, command=self.alternar_diagnostico).pack(side="left")
+        ttk.Button(botoes, text="Atualizar", command=self.atualizar_diagnostico).pack(side="left", padx=(10, 0))
+        ttk.Button(botoes, text="Limpar", command=self.limpar_diagnostico).pack(side="left", padx=(5, 0))
+        ttk.Button(botoes, text="Salvar em arquivo", command=self.salvar_diagnostico).pack(side="right")
+
+        # Caixa de texto com o resumo (fonte de largura fixa para alinhar as colunas)
+        texto_frame = ttk.Frame(frame)
+        texto_frame.pack(expand=True, fill="both", padx=10, pady=(0, 10))
+        barra = ttk.Scrollbar(texto_frame, orient="vertical")
+        self.diagnostico_txt = tk.Text(texto_frame, wrap="none", font=("Courier", 9), yscrollcommand=barra.set)
+        barra.config(command=self.diagnostico_txt.yview)
+        barra.pack(side="right", fill="y")
+        self.diagnostico_txt.pack(expand=True, fill="both")
+        self.atualizar_diagnostico()
+
+    # Método para ligar ou desligar a medição das operações
+    def alternar_diagnostico(self):
+        if self.diagnostico_var.get():
+            diagnostico.ativar()
+        else:
+            diagnostico.desativar()
+        self.atualizar_diagnostico()
+
+    # Método para mostrar o resumo atual do diagnóstico
+    def atualizar_diagnostico(self):
+        self.diagnostico_txt.config(state="normal")
+        self.diagnostico_txt.delete("1.0", "end")
+        self.diagnostico_txt.insert("1.0", diagnostico.resumo())
+        self.diagnostico_txt.config(state="disabled")  # Somente leitura
+
+    # Método para apagar as medições feitas até agora
+    def limpar_diagnostico(self):
+        diagnostico.limpar()
+        self.atualizar_diagnostico()
+
+    # Método para gravar o resumo do diagnóstico num arquivo
+    def salvar_diagnostico(self):
+        arquivo = diagnostico.gravar_resumo()
+        messagebox.showinfo("Diagnóstico", f"Resumo gravado em {arquivo}.")
+
+    # Método para cadastrar um livro
+    def cadastrar_livro(self):
+        campos_obrigatorios = ["título", "autor", "publicação", "isbn", "categoria"]  # Campos obrigatórios para cadastro
+        for campo in campos_obrigatorios:
+            valor = self.livro_vars[campo].get().strip()  # Obtém o valor do campo
+            if not valor:
+                messagebox.showerror("Erro", f"O campo {campo.capitalize()} é obrigatório.")  # Exibe mensagem de erro se o campo estiver vazio
+                return
+
+        # Obtém os valores dos campos
+        titulo = self.livro_vars["título"].get().strip()
+        autor = self.livro_vars["autor"].get().strip()
+        publicacao = self.livro_vars["publicação"].get().strip()
+        isbn = self.livro_vars["isbn"].get().strip()
+        categoria = self.livro_vars["categoria"].get().strip()
+
+        # Sem id_exemplar: a biblioteca reserva o próximo ID no momento da gravação, nenhum outro cadastro pega o mesmo
+        def cadastrar():
+            livro = Livro(titulo, autor, publicacao, isbn, categoria, None)  # Cria uma instância do livro
+            self.biblioteca.cadastra_livro(livro)  # Cadastra o livro na biblioteca
+        self.executar(cadastrar, ao_concluir=lambda _: messagebox.showinfo("Sucesso", "Livro cadastrado com sucesso!"), descricao="Cadastrando livro...", escrita=True)
+        for var in self.livro_vars.values():
+            var.set("")  # Limpa os campos após o cadastro
+
+    # Método para cadastrar um usuário
+    def cadastrar_usuario(self):
+        nome = self.usuario_vars["nome"].get().strip()  # Obtém o nome do usuário
+        email = self.usuario_vars["email"].get().strip()  # Obtém o email do usuário
+        tipo = self.usuario_vars["tipo"].get().strip()  # Obtém o tipo do usuário
+        if not (nome and email and tipo):
+            messagebox.showerror("Erro", "Todos os campos são obrigatórios.")  # Exibe mensagem de erro se algum campo estiver vazio
+            return
+        usuario = Usuario(nome, email, tipo)  # Cria uma instância do usuário
+        # Cadastra o usuário na biblioteca
+        self.executar(self.biblioteca.cadastra_usuario, usuario, ao_concluir=lambda _: messagebox.showinfo("Sucesso", "Usuário cadastrado com sucesso!"), descricao="Cadastrando usuário...", escrita=True)
+        for var in self.usuario_vars.values():
+            var.set("")  # Limpa os campos após o cadastro
+
+    # Método para buscar um livro
+    def buscar_livro(self):
+        criterio = self.criterio_var.get()  # Obtém o critério de busca
+        valor = self.valor_busca.get().strip()  # Obtém o valor de busca
+        if not valor:
+            messagebox.showerror("Erro", "Informe o valor para busca.")  # Exibe mensagem de erro se o valor estiver vazio
+            return
+        # Uma busca nova substitui a anterior: ela é cancelada se ainda não começou e, se já começou, o resultado é ignorado
+        if self._busca is not None:
+            self._busca.cancel()
+        self._geracao_busca += 1
+        geracao = self._geracao_busca
+        self._busca = self.executar(self.biblioteca.busca_livros, criterio, valor, ao_concluir=lambda resultados: self._mostrar_busca(geracao, resultados), descricao="Buscando livros...")
+        self.valor_busca.set("")  # Limpa o campo de busca após a operação
+
+    # Método para exibir o resultado de uma busca, se ela ainda for a mais recente
+    def _mostrar_busca(self, geracao, resultados):
+        if geracao != self._geracao_busca:
+            return  # Busca substituída por outra mais nova
+        if resultados:
+            # Cria uma mensagem com os resultados da busca
+            msg = "\n".join([f"{livro.titulo} - {livro.autor} - {livro.categoria}" for livro in resultados])
+            messagebox.showinfo("Resultado da Busca", msg)  # Exibe os resultados da busca
+        else:
+            messagebox.showinfo("Resultado da Busca", "Nenhum livro encontrado.")  # Exibe mensagem se não houver resultados
+
+    # Método para obter uma página da listagem, reaproveitando as páginas já buscadas
+    # Roda numa thread de leitura (via executar): sincronizar pode esperar pela trava ou reler os arquivos
+    def buscar_pagina(self, pagina, coluna=None, decrescente=False, filtro=None):
+        self.biblioteca.sincronizar()  # Se os arquivos mudaram por fora, a versão muda e o cache antigo deixa de valer
+        chave = (self.biblioteca.versao, pagina, coluna, decrescente, filtro)
+        with self._lock_paginas:
+            if chave in self._cache_paginas:
+                diagnostico.contar("cache de páginas: acertos")
+                self._cache_paginas.move_to_end(chave)  # Página usada recentemente
+                return self._cache_paginas[chave]
+        diagnostico.contar("cache de páginas: faltas")
+        resultado = self.biblioteca.pagina_livros(pagina * self.TAMANHO_PAGINA, self.TAMANHO_PAGINA, coluna, decrescente, filtro)
+        with self._lock_paginas:
+            self._cache_paginas[chave] = resultado
+            if len(self._cache_paginas) > self.PAGINAS_EM_CACHE:
+                self._cache_paginas.popitem(last=False)  # Descarta a página usada há mais tempo
+        return resultado
+
+    # Método para listar todos os livros cadastrados; a primeira página é buscada fora da thread da interface
+    def listar_todos_livros(self):
+        self.executar(self.buscar_pagina, 0, ao_concluir=self._abrir_listagem, descricao="Carregando livros...")
+
+    # Método para abrir a listagem com a primeira página já buscada
+    def _abrir_listagem(self, primeira):
+        total, _ = primeira
+        if not total:
+            messagebox.showinfo("Listar Livros", "Nenhum livro cadastrado.")  # Exibe mensagem se não houver livros
+            return
+        JanelaLivros(self, primeira)  # Abre a janela com a listagem paginada
+
+    # Método para realizar um empréstimo
+    def realizar_emprestimo(self):
+        try:
+            id_exemplar = int(self.emprestimo_id.get())  # Obtém o ID do exemplar
+        except Exception:
+            messagebox.showerror("Erro", "ID Exemplar inválido.")  # Exibe mensagem de erro se o ID não for válido
+            return
+        email = self.emprestimo_email.get().strip()  # Obtém o email do usuário
+        # Registra o empréstimo
+        self.executar(self.biblioteca.cadastra_emprestimo, id_exemplar, email, ao_concluir=lambda _: messagebox.showinfo("Sucesso", "Empréstimo registrado com sucesso!"), descricao="Registrando empréstimo...", escrita=True)
+        self.emprestimo_id.set("")  # Limpa o campo do ID do exemplar
+        self.emprestimo_email.set("")  # Limpa o campo do email do usuário
+
+    # Método para devolver um livro
+    def devolver_livro(self):
+        try:
+            id_exemplar = int(self.devolve_id.get())  # Obtém o ID do exemplar a ser devolvido
+        except Exception:
+            messagebox.showerror("Erro", "ID Exemplar inválido.")  # Exibe mensagem de erro se o ID não for válido
+            return
+        # Registra a devolução do livro
+        self.executar(self.biblioteca.devolve_livro, id_exemplar, ao_concluir=lambda _: messagebox.showinfo("Sucesso", "Livro devolvido com sucesso!"), descricao="Registrando devolução...", escrita=True)
+        self.devolve_id.set("")  # Limpa o campo do ID do exemplar
+
+    # Método para listar todos os empréstimos ativos
+    def listar_emprestimos(self):
+        self.executar(self.biblioteca.lista_emprestimos, ao_concluir=self._mostrar_emprestimos, descricao="Listando empréstimos...")
+
+    def _mostrar_emprestimos(self, emprestimos):
+        if not emprestimos:
+            messagebox.showinfo("Info", "Nenhum empréstimo ativo.")  # Exibe mensagem se não houver empréstimos
+            return
+        # Cria uma mensagem com os detalhes dos empréstimos
+        msg = "\n".join([f"Livro ID: {emp.id_exemplar}, Usuário: {emp.usuario_email}, Data: {emp.data_emprestimo}" for emp in emprestimos])
+        messagebox.showinfo("Empréstimos Ativos", msg)  # Exibe a lista de empréstimos ativos
+
+    # Método para exibir a quantidade de livros por categoria
+    def relatorio_categorias(self):
+        self.executar(self.biblioteca.livros_por_categoria, ao_concluir=self._mostrar_categorias, descricao="Gerando relatório...")
+
+    def _mostrar_categorias(self, categoria_count):
+        if categoria_count:
+            # Cria uma mensagem com a contagem de livros por categoria
+            msg = "\n".join([f"{cat}: {count}" for cat, count in categoria_count.items()])
+            messagebox.showinfo("Livros por Categoria", msg)  # Exibe a contagem de livros por categoria
+        else:
+            messagebox.showinfo("Livros por Categoria", "Nenhum livro cadastrado.")  # Exibe mensagem se não houver livros
+
+    # Método para exibir a quantidade de empréstimos por tipo de usuário
+    def relatorio_tipos_usuario(self):
+        self.executar(self.biblioteca.emprestimos_por_usuario, ao_concluir=self._mostrar_tipos_usuario, descricao="Gerando relatório...")
+
+    def _mostrar_tipos_usuario(self, type_count):
+        if type_count:
+            # Cria uma mensagem com a contagem de empréstimos por tipo de usuário
+            msg = "\n".join([f"{tipo}: {count}" for tipo, count in type_count.items()])
+            messagebox.showinfo("Empréstimos por Tipo de Usuário", msg)  # Exibe a contagem de empréstimos por tipo de usuário
+        else:
+            messagebox.showinfo("Empréstimos por Tipo de Usuário", "Nenhum empréstimo registrado.")  # Exibe mensagem se não houver empréstimos
+
+    # Método para exibir os livros mais emprestados
+    def relatorio_mais_emprestados(self):
+        self.executar(self.biblioteca.livros_mais_emprestados, ao_concluir=self._mostrar_mais_emprestados, descricao="Gerando relatório...")
+
+    def _mostrar_mais_emprestados(self, top_books):
+        if not top_books:
+            messagebox.showinfo("Livros mais Emprestados", "Nenhum livro cadastrado.")  # Exibe mensagem se não houver livros
+            return
+        # Cria uma mensagem com os livros mais emprestados
+        msg = "\n".join([f"{livro.titulo} - {livro.emprestimos_count} empréstimos" for livro in top_books])
+        messagebox.showinfo("Livros Mais Emprestados", msg)  # Exibe os livros mais emprestados
+
+    # Método para exibir os empréstimos ativos que passaram do prazo de devolução
+    def relatorio_atrasados(self):
+        self.executar(self.biblioteca.emprestimos_atrasados, ao_concluir=self._mostrar_atrasados, descricao="Gerando relatório...")
+
+    def _mostrar_atrasados(self, atrasados):
+        if not atrasados:
+            messagebox.showinfo("Empréstimos Atrasados", "Nenhum empréstimo atrasado.")  # Exibe mensagem se não houver atrasos
+            return
+        # Cria uma mensagem com os empréstimos fora do prazo
+        msg = "\n".join([f"Livro ID: {emp.id_exemplar}, Usuário: {emp.usuario_email}, Data: {emp.data_emprestimo}" for emp in atrasados])
+        messagebox.showinfo("Empréstimos Atrasados", msg)  # Exibe os empréstimos atrasados
+
+# Função que cria a janela principal e inicia a interface gráfica
+def iniciar(biblioteca=None):
+    root = tk.Tk()  # Cria a janela principal
+    app = BibliotecaApp(root, biblioteca)  # Cria uma instância da aplicação
+    root.mainloop()  # Inicia o loop principal da interface gráfica
+    app.biblioteca.fechar()  # Sincroniza o diário antes de sair
@@ -0,0 +1,76 @@
+import json
+import sys
+import tracemalloc
+
+from biblioteca import ColunasLivros, Emprestimo, Livro, Usuario
+
+# Classe com __dict__, como os registros eram guardados antes (um dicionário de atributos por objeto)
+class RegistroComDict:
+    def __init__(self, dados):
+        self.__dict__.update(dados)
+
+# Função que gera registros sintéticos no formato dos arquivos (com poucos autores, categorias e tipos)
+def gerar_registros(quantidade):
+    livros = [{
+        "titulo": f"Livro {i // 3}",
+        "autor": f"Autor {i % 500}",
+        "publicacao": str(1950 + i % 70),
+        "isbn": f"978-{i // 3:09d}",
+        "categoria": f"Categoria {i % 20}",
+        "id_exemplar": i + 1,
+        "emprestado": i % 10 == 0,
+        "emprestimos_count": i % 300,
+    } for i in range(quantidade)]
+    usuarios = [{"nome": f"Usuário {i}", "email": f"usuario{i}@exemplo.com", "tipo": ("aluno", "professor")[i % 2]}
+                for i in range(max(1, quantidade // 100))]
+    emprestimos = [{"id_exemplar": i + 1, "usuario_email": usuarios[i % len(usuarios)]["email"], "data_emprestimo": "2024-05-17 14:03:59"}
+                   for i in range(0, quantidade, 10)]
+    return {"livros": livros, "usuarios": usuarios, "emprestimos": emprestimos}
+
+# Função que mede quantos bytes ficam ocupados depois de ler os registros do texto JSON e convertê-los com `criar`
+# Os dicionários lidos são descartados; só sobra o que a representação final mantém vivo
+def medir(criar, registros):
+    texto = json.dumps(registros)
+    tracemalloc.start()
+    antes = tracemalloc.get_traced_memory()[0]
+    objetos = criar(json.loads(texto))
+    depois = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objetos
+    return depois - antes
+
+# Função que mede e imprime a memória por registro de cada representação
+def comparar(quantidade):
+    estado = gerar_registros(quantidade)
+    # Todos os textos são lidos do JSON, como na carga dos arquivos: cada registro começa com as suas próprias cópias
+
+    def livros_objetos(dados):
+        colunas = ColunasLivros()
+        livros = [Livro.de_dict(registro) for registro in dados]
+        for livro in livros:
+            colunas.anexar(livro)
+        return livros, colunas
+
+    medidas = [
+        ("livros", len(estado["livros"]), [
+            ("dict", medir(list, estado["livros"])),
+            ("objeto com __dict__", medir(lambda dados: [RegistroComDict(registro) for registro in dados], estado["livros"])),
+            ("Livro (__slots__ + colunas)", medir(livros_objetos, estado["livros"])),
+        ]),
+        ("usuarios", len(estado["usuarios"]), [
+            ("dict", medir(list, estado["usuarios"])),
+            ("Usuario (__slots__)", medir(lambda dados: [Usuario.de_dict(registro) for registro in dados], estado["usuarios"])),
+        ]),
+        ("emprestimos", len(estado["emprestimos"]), [
+            ("dict", medir(list, estado["emprestimos"])),
+            ("Emprestimo (__slots__ + instante inteiro)", medir(lambda dados: [Emprestimo.de_dict(registro) for registro in dados], estado["emprestimos"])),
+        ]),
+    ]
+    for nome, total, resultados in medidas:
+        print(f"{nome} ({total} registros)")
+        for representacao, tamanho in resultados:
+            print(f"  {representacao:<45} {tamanho / total:8.1f} bytes/registro")
+
+# Uso: python memoria.py [quantidade de livros]
+if __name__ == "__main__":
+    comparar(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
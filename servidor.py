@@ -0,0 +1,294 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+import json
+import sys
+from urllib.parse import parse_qs, urlsplit
+
+from biblioteca import Biblioteca, ConsultaInvalida, ErroBiblioteca, ExemplarInvalido, Livro, LivroIndisponivel, Usuario, UsuarioJaCadastrado, UsuarioNaoEncontrado
+from historico import PRAZO_EMPRESTIMO
+
+# Situação HTTP de cada erro de regra da biblioteca
+SITUACOES_ERRO = {
+    ConsultaInvalida: 400,
+    ExemplarInvalido: 400,
+    UsuarioNaoEncontrado: 404,
+    LivroIndisponivel: 409,
+    UsuarioJaCadastrado: 409,
+}
+TEXTOS_SITUACAO = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 409: "Conflict",
+                   413: "Payload Too Large", 500: "Internal Server Error"}
+TAMANHO_MAXIMO_CORPO = 1024 * 1024  # Corpo máximo aceito numa requisição (1 MiB)
+
+# Exceção para uma requisição inválida; vira uma resposta com a situação informada
+class ErroRequisicao(Exception):
+    def __init__(self, situacao, mensagem):
+        super().__init__(mensagem)
+        self.situacao = situacao
+
+# Função que obtém um parâmetro inteiro da URL ou do corpo, com valor padrão
+def inteiro(valores, nome, padrao=None):
+    valor = valores.get(nome, padrao)
+    if valor is None:
+        raise ErroRequisicao(400, f"Parâmetro '{nome}' é obrigatório.")
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        raise ErroRequisicao(400, f"Parâmetro '{nome}' deve ser um número inteiro.")
+
+# Função que obtém um campo de texto obrigatório do corpo
+def texto(valores, nome):
+    valor = valores.get(nome)
+    valor = "" if valor is None else str(valor).strip()
+    if not valor:
+        raise ErroRequisicao(400, f"O campo {nome} é obrigatório.")
+    return valor
+
+# Classe que expõe a Biblioteca por HTTP/JSON
+# As leituras rodam num grupo de threads; as gravações entram numa fila atendida por uma única tarefa (um gravador)
+class ServidorBiblioteca:
+    def __init__(self, biblioteca, leitores=8):
+        self.biblioteca = biblioteca  # Biblioteca mantida em memória durante toda a execução
+        self._leitura = ThreadPoolExecutor(max_workers=leitores, thread_name_prefix="servidor-leitura")
+        self._escrita = ThreadPoolExecutor(max_workers=1, thread_name_prefix="servidor-escrita")
+        self._fila_escrita = None  # asyncio.Queue com (função, argumentos, futuro); criada quando o servidor inicia
+        self._gravador = None  # Tarefa que consome a fila de gravações
+        # Rotas: (método, caminho) -> (função, é gravação)
+        self.rotas = {
+            ("GET", "/livros"): (self.listar_livros, False),
+            ("GET", "/livro"): (self.obter_livro, False),
+            ("GET", "/busca"): (self.buscar, False),
+            ("GET", "/emprestimos"): (self.listar_emprestimos, False),
+            ("GET", "/emprestimos/atrasados"): (self.listar_atrasados, False),
+            ("GET", "/historico"): (self.consultar_historico, False),
+            ("GET", "/relatorios/categorias"): (self.relatorio_categorias, False),
+            ("GET", "/relatorios/usuarios"): (self.relatorio_usuarios, False),
+            ("GET", "/relatorios/mais-emprestados"): (self.relatorio_mais_emprestados, False),
+            ("POST", "/livros"): (self.cadastrar_livro, True),
+            ("POST", "/usuarios"): (self.cadastrar_usuario, True),
+            ("POST", "/emprestimos"): (self.realizar_emprestimo, True),
+            ("POST", "/devolucoes"): (self.devolver_livro, True),
+        }
+
+    # --- Operações (rodam fora do laço de eventos e retornam (situação, dados)) ---
+
+    # Método para listar uma página de livros: ?inicio=0&quantidade=100&coluna=titulo&decrescente=1&criterio=autor&valor=...
+    def listar_livros(self, parametros, corpo):
+        inicio = max(0, inteiro(parametros, "inicio", 0))
+        quantidade = min(1000, max(1, inteiro(parametros, "quantidade", 100)))
+        coluna = parametros.get("coluna") or None
+        decrescente = parametros.get("decrescente") in ("1", "true", "sim")
+        filtro = None
+        if parametros.get("valor"):
+            filtro = (parametros.get("criterio", "título"), parametros["valor"])
+        total, livros = self.biblioteca.pagina_livros(inicio, quantidade, coluna, decrescente, filtro)  # Coluna ou critério inválido: 400
+        return 200, {"total": total, "livros": livros}
+
+    # Método para obter um exemplar: ?id_exemplar=1
+    def obter_livro(self, parametros, corpo):
+        livro = self.biblioteca.busca_exemplar(inteiro(parametros, "id_exemplar"))
+        if livro is None:
+            raise ErroRequisicao(404, "Livro não encontrado.")
+        return 200, livro.para_dict()
+
+    # Método para buscar livros: ?criterio=título&valor=...&maximo=50
+    def buscar(self, parametros, corpo):
+        criterio = parametros.get("criterio", "título")
+        valor = texto(parametros, "valor")
+        maximo = min(1000, max(1, inteiro(parametros, "maximo", 50)))
+        livros = self.biblioteca.busca_livros(criterio, valor, maximo)  # Critério inválido: 400
+        return 200, [livro.para_dict() for livro in livros]
+
+    # Método para listar os empréstimos ativos
+    def listar_emprestimos(self, parametros, corpo):
+        return 200, [emprestimo.para_dict() for emprestimo in self.biblioteca.lista_emprestimos()]
+
+    # Método para listar os empréstimos ativos fora do prazo: ?prazo=14 (dias)
+    def listar_atrasados(self, parametros, corpo):
+        emprestimos = self.biblioteca.emprestimos_atrasados(inteiro(parametros, "prazo", PRAZO_EMPRESTIMO))
+        return 200, [emprestimo.para_dict() for emprestimo in emprestimos]
+
+    # Método para consultar os empréstimos devolvidos: ?de=2024-03-01&ate=2024-04-01&usuario=...&maximo=1000
+    def consultar_historico(self, parametros, corpo):
+        maximo = min(10000, max(1, inteiro(parametros, "maximo", 1000)))
+        try:
+            registros = self.biblioteca.historico.consultar(parametros.get("de"), parametros.get("ate"), parametros.get("usuario"))
+        except ValueError:
+            raise ErroRequisicao(400, "Datas devem estar no formato AAAA-MM-DD.")
+        return 200, list(islice(registros, maximo))
+
+    # Métodos dos relatórios
+    def relatorio_categorias(self, parametros, corpo):
+        return 200, self.biblioteca.livros_por_categoria()
+
+    def relatorio_usuarios(self, parametros, corpo):
+        return 200, self.biblioteca.emprestimos_por_usuario()
+
+    def relatorio_mais_emprestados(self, parametros, corpo):
+        quantidade = min(1000, max(1, inteiro(parametros, "quantidade", 3)))
+        livros = self.biblioteca.livros_mais_emprestados(quantidade)
+        return 200, [livro.para_dict() for livro in livros]
+
+    # Método para cadastrar um livro: {"titulo", "autor", "publicacao", "isbn", "categoria"}; o ID é reservado na gravação
+    def cadastrar_livro(self, parametros, corpo):
+        campos = [texto(corpo, campo) for campo in ("titulo", "autor", "publicacao", "isbn", "categoria")]
+        livro = self.biblioteca.cadastra_livro(Livro(*campos, None))
+        return 201, livro.para_dict()
+
+    # Método para cadastrar um usuário: {"nome", "email", "tipo"}
+    def cadastrar_usuario(self, parametros, corpo):
+        usuario = self.biblioteca.cadastra_usuario(Usuario(texto(corpo, "nome"), texto(corpo, "email"), texto(corpo, "tipo")))
+        return 201, usuario.para_dict()
+
+    # Método para realizar um empréstimo: {"id_exemplar", "usuario_email"}
+    def realizar_emprestimo(self, parametros, corpo):
+        emprestimo = self.biblioteca.cadastra_emprestimo(inteiro(corpo, "id_exemplar"), texto(corpo, "usuario_email"))
+        return 201, emprestimo.para_dict()
+
+    # Método para devolver um livro: {"id_exemplar"}
+    def devolver_livro(self, parametros, corpo):
+        emprestimo = self.biblioteca.devolve_livro(inteiro(corpo, "id_exemplar"))
+        if emprestimo is None:
+            raise ErroRequisicao(404, "Não há empréstimo ativo para este exemplar.")
+        return 200, emprestimo.para_dict()
+
+    # --- Execução ---
+
+    # Tarefa única que grava, na ordem de chegada, as operações colocadas na fila
+    # As gravações que chegam juntas vão para a thread de escrita num só lote, em vez de uma troca de thread por gravação
+    async def _gravar(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            lote = [await self._fila_escrita.get()]
+            while not self._fila_escrita.empty() and len(lote) < 256:
+                lote.append(self._fila_escrita.get_nowait())
+            resultados = await loop.run_in_executor(self._escrita, self._executar_lote, lote)
+            for (_, _, futuro), (resultado, erro) in zip(lote, resultados):
+                if futuro.done():
+                    continue  # O cliente desistiu da requisição
+                if erro is not None:
+                    futuro.set_exception(erro)
+                else:
+                    futuro.set_result(resultado)
+
+    # Método que executa um lote de gravações em sequência; retorna (resultado, erro) de cada uma
+    @staticmethod
+    def _executar_lote(lote):
+        resultados = []
+        for funcao, argumentos, _ in lote:
+            try:
+                resultados.append((funcao(*argumentos), None))
+            except Exception as erro:
+                resultados.append((None, erro))
+        return resultados
+
+    # Método para executar uma operação: leituras em paralelo, gravações pela fila do gravador
+    async def executar(self, funcao, gravacao, *argumentos):
+        if gravacao:
+            futuro = asyncio.get_running_loop().create_future()
+            await self._fila_escrita.put((funcao, argumentos, futuro))
+            return await futuro
+        return await asyncio.get_running_loop().run_in_executor(self._leitura, funcao, *argumentos)
+
+    # Método para tratar uma requisição já lida; retorna (situação, dados)
+    async def responder(self, metodo, alvo, corpo):
+        url = urlsplit(alvo)
+        parametros = {nome: valores[-1] for nome, valores in parse_qs(url.query).items()}
+        rota = self.rotas.get((metodo, url.path.rstrip("/") or "/"))
+        if rota is None:
+            caminhos = {caminho for _, caminho in self.rotas}
+            if url.path.rstrip("/") in caminhos:
+                raise ErroRequisicao(405, "Método não permitido.")
+            raise ErroRequisicao(404, "Recurso não encontrado.")
+        funcao, gravacao = rota
+        if corpo:
+            try:
+                corpo = json.loads(corpo)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                raise ErroRequisicao(400, "O corpo deve ser um JSON válido.")
+            if not isinstance(corpo, dict):
+                raise ErroRequisicao(400, "O corpo deve ser um objeto JSON.")
+        else:
+            corpo = {}
+        try:
+            return await self.executar(funcao, gravacao, parametros, corpo)
+        except ErroBiblioteca as erro:
+            raise ErroRequisicao(SITUACOES_ERRO.get(type(erro), 409), str(erro))
+
+    # Método que atende uma conexão; mantém a conexão aberta entre requisições (keep-alive)
+    async def atender(self, leitor, escritor):
+        try:
+            while True:
+                linha = await leitor.readline()
+                if not linha:
+                    break
+                try:
+                    metodo, alvo, versao = linha.decode("latin-1").split()
+                except ValueError:
+                    break  # Linha de requisição inválida: encerra a conexão
+                cabecalhos = {}
+                while True:
+                    cabecalho = await leitor.readline()
+                    if cabecalho in (b"\r\n", b"\n", b""):
+                        break
+                    nome, _, valor = cabecalho.decode("latin-1").partition(":")
+                    cabecalhos[nome.strip().lower()] = valor.strip()
+                manter = cabecalhos.get("connection", "").lower() != "close" and versao == "HTTP/1.1"
+
+                try:
+                    tamanho = int(cabecalhos.get("content-length", 0))
+                    if tamanho > TAMANHO_MAXIMO_CORPO:
+                        manter = False
+                        raise ErroRequisicao(413, "Corpo grande demais.")
+                    corpo = await leitor.readexactly(tamanho) if tamanho else b""
+                    situacao, dados = await self.responder(metodo.upper(), alvo, corpo)
+                except ErroRequisicao as erro:
+                    situacao, dados = erro.situacao, {"erro": str(erro)}
+                except ValueError:
+                    situacao, dados = 400, {"erro": "Cabeçalho Content-Length inválido."}
+                    manter = False
+                except Exception as erro:
+                    situacao, dados = 500, {"erro": f"Erro interno: {erro}"}
+
+                conteudo = json.dumps(dados, ensure_ascii=False).encode("utf-8")
+                escritor.write(
+                    f"HTTP/1.1 {situacao} {TEXTOS_SITUACAO.get(situacao, '')}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(conteudo)}\r\n"
+                    f"Connection: {'keep-alive' if manter else 'close'}\r\n\r\n".encode("latin-1") + conteudo
+                )
+                await escritor.drain()
+                if not manter:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass  # Cliente desconectou no meio da requisição
+        finally:
+            escritor.close()
+
+    # Método para iniciar o servidor e atender até ser interrompido
+    async def servir(self, endereco="127.0.0.1", porta=8080, pronto=None):
+        self._fila_escrita = asyncio.Queue()
+        self._gravador = asyncio.create_task(self._gravar())
+        servidor = await asyncio.start_server(self.atender, endereco, porta, backlog=1024)
+        if pronto is not None:
+            pronto(servidor)
+        try:
+            async with servidor:
+                await servidor.serve_forever()
+        finally:
+            self._gravador.cancel()
+            self._leitura.shutdown()
+            self._escrita.shutdown()
+
+# Uso: python servidor.py [porta] [endereço]
+if __name__ == "__main__":
+    porta = int(sys.argv[1]) if len(sys.argv) > 1 else 8080
+    endereco = sys.argv[2] if len(sys.argv) > 2 else "127.0.0.1"
+    biblioteca = Biblioteca()
+    try:
+        print(f"Servidor da biblioteca em http://{endereco}:{porta}/")
+        asyncio.run(ServidorBiblioteca(biblioteca).servir(endereco, porta))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        biblioteca.fechar()
@@ -0,0 +1,125 @@
+import difflib
+import random
+import sys
+import time
+
+from benchmark import PALAVRAS
+from indices import IndiceTrigramas
+
+TITULOS = 20000  # Tamanho do corpus de referência
+SEMENTE = 2004  # Mesma semente, mesmo corpus
+MINIMO = 0.3  # A mesma similaridade mínima de Biblioteca.busca_livros
+LIMITES = (10, 50, 1000, None)  # Tamanhos de resultado verificados (None = todos os títulos acima do mínimo)
+
+# Consultas fixas: títulos inteiros, trechos, erros de digitação, consultas curtas e sem acento
+CONSULTAS = [
+    "Harry Potter", "harry poter", "harry potter e o calice", "Dom Casmurro", "dom", "py", "o", "senhor dos aneis",
+    "O Senhor dos Anéis", "python", "Memórias Póstumas", "grande sertao", "vidas secas", "cem anos de solidao", "1984",
+    "guerra e paz", "o nome da rosa", "capitaes da areia", "A Hora da Estrela", "Estruturas de dados", "crime castigo",
+    "the secret chamber", "edição comentada", "volume 2", "amor", "casa", "o pequeno principe", "jogos vorazes", "fundação",
+    "algoritmos",
+]
+
+# Títulos reais do corpus de referência: séries e edições parecidas entre si, que disputam as primeiras posições
+REAIS = [
+    "Harry Potter e a Pedra Filosofal", "Harry Potter e a Câmara Secreta", "Harry Potter e o Prisioneiro de Azkaban",
+    "Harry Potter e o Cálice de Fogo", "Harry Potter e a Ordem da Fênix", "Harry Potter e o Enigma do Príncipe",
+    "Harry Potter e as Relíquias da Morte", "Harry Potter and the Philosopher's Stone", "Harry Potter and the Chamber of Secrets",
+    "Harry Potter and the Prisoner of Azkaban", "Harry Potter and the Goblet of Fire", "O Senhor dos Anéis: A Sociedade do Anel",
+    "O Senhor dos Anéis: As Duas Torres", "O Senhor dos Anéis: O Retorno do Rei", "O Hobbit", "O Silmarillion",
+    "Dom Casmurro", "Dom Quixote", "Memórias Póstumas de Brás Cubas", "Memorial de Aires", "Grande Sertão: Veredas", "Vidas Secas",
+    "São Bernardo", "Capitães da Areia", "Gabriela, Cravo e Canela", "O Cortiço", "Iracema", "O Guarani", "Macunaíma",
+    "A Hora da Estrela", "Laços de Família", "O Tempo e o Vento", "Os Maias", "O Primo Basílio", "Ensaio sobre a Cegueira",
+    "Cem Anos de Solidão", "O Amor nos Tempos do Cólera", "A Divina Comédia", "Os Lusíadas", "O Pequeno Príncipe", "O Alquimista",
+    "1984", "A Revolução dos Bichos", "Admirável Mundo Novo", "Fahrenheit 451", "Orgulho e Preconceito", "Crime e Castigo",
+    "Os Irmãos Karamázov", "Guerra e Paz", "Anna Kariênina", "Os Miseráveis", "O Conde de Monte Cristo", "Moby Dick",
+    "O Velho e o Mar", "A Metamorfose", "O Processo", "O Estrangeiro", "O Nome da Rosa", "As Cidades Invisíveis",
+    "Jogos Vorazes", "Em Chamas", "A Guerra dos Tronos", "A Fúria dos Reis", "Duna", "Fundação", "Eu, Robô",
+    "O Guia do Mochileiro das Galáxias", "Introdução à Programação com Python", "Estruturas de Dados e Algoritmos",
+    "Algoritmos: Teoria e Prática", "Código Limpo", "Python Fluente", "Aprendendo Python", "Sistemas Operacionais Modernos",
+    "Cálculo Volume 1", "História do Brasil", "Os Sertões", "Raízes do Brasil", "O Príncipe", "A República",
+]
+SUFIXOS = ["Edição Comentada", "Edição de Bolso", "Edição Especial", "Edição Ilustrada", "Volume 1", "Volume 2", "Volume 3",
+           "Edição Revista", "Texto Integral", "Adaptação", "Em Quadrinhos", "Guia de Leitura", "Ensaios Críticos", "Antologia"]
+# Palavras dos títulos sintéticos: as do benchmark e algumas das consultas, para que elas tenham muitos concorrentes
+VOCABULARIO = PALAVRAS + "harry potter python dados rei rainha príncipe dragão castelo sertão senhor anel the of stone fire secret chamber".split()
+CONECTORES = ["de", "do", "da", "dos", "das", "e", "o", "a", "no", "na", "em", "sobre", "entre", "sem", "para"]
+
+# Função que gera o corpus de referência: os títulos reais, edições deles, variações com uma palavra trocada e
+# títulos sintéticos; sem repetições e sempre o mesmo para a mesma semente
+def gerar_titulos(quantidade=TITULOS, semente=SEMENTE):
+    sorteio = random.Random(semente)
+    titulos = list(REAIS)
+    vistos = set(titulos)
+    while len(titulos) < quantidade:
+        escolha = sorteio.random()
+        if escolha < 0.25:
+            titulo = f"{sorteio.choice(REAIS)}: {sorteio.choice(SUFIXOS)}"
+        elif escolha < 0.45:
+            palavras = sorteio.choice(REAIS).split(":")[0].split()
+            i = sorteio.randrange(len(palavras))
+            nova = sorteio.choice(VOCABULARIO)
+            palavras[i] = nova.capitalize() if palavras[i][0].isupper() else nova
+            titulo = " ".join(palavras)
+        else:
+            palavras = [sorteio.choice(VOCABULARIO)]
+            for _ in range(sorteio.randint(1, 4)):
+                if sorteio.random() < 0.6:
+                    palavras.append(sorteio.choice(CONECTORES))
+                palavras.append(sorteio.choice(VOCABULARIO))
+            titulo = " ".join(palavras).capitalize()
+        if titulo not in vistos:
+            vistos.add(titulo)
+            titulos.append(titulo)
+    sorteio.shuffle(titulos)
+    return titulos
+
+# Função que gera consultas com erros de digitação a partir de títulos sorteados do corpus (sempre as mesmas)
+def consultas_com_erros(titulos, quantidade, semente=7):
+    sorteio = random.Random(semente)
+    consultas = []
+    for _ in range(quantidade):
+        letras = list(sorteio.choice(titulos).lower())
+        for _ in range(sorteio.randint(0, 3)):
+            letras[sorteio.randrange(len(letras))] = sorteio.choice("abcdefghijklmnopqrstuvwxyz ")
+        consultas.append("".join(letras)[:sorteio.randint(3, 30)])
+    return consultas
+
+# Função que calcula o resultado de referência: todos os títulos comparados com o difflib, como a busca original
+# Retorna as chaves (posição no corpus, a partir de 1) da mais parecida para a menos parecida; no empate, pela chave
+def varredura(titulos, consulta):
+    consulta = consulta.lower()
+    pontuados = [(difflib.SequenceMatcher(None, consulta, titulo.lower()).ratio(), chave) for chave, titulo in enumerate(titulos, 1)]
+    return [chave for similaridade, chave in sorted(pontuados, key=lambda item: (-item[0], item[1])) if similaridade >= MINIMO]
+
+# Função que compara o índice com a varredura completa em todas as consultas; retorna a quantidade de divergências
+def verificar(titulos, consultas):
+    indice = IndiceTrigramas()
+    for chave, titulo in enumerate(titulos, 1):
+        indice.adicionar(chave, titulo)
+    divergencias = 0
+    tempo_varredura = tempo_indice = 0.0
+    for consulta in consultas:
+        inicio = time.perf_counter()
+        esperado = varredura(titulos, consulta)
+        tempo_varredura += time.perf_counter() - inicio
+        for maximo in LIMITES:
+            inicio = time.perf_counter()
+            obtido = indice.buscar(consulta, MINIMO, maximo)
+            tempo_indice += time.perf_counter() - inicio
+            if obtido != esperado[:maximo]:
+                divergencias += 1
+                faltando = len(set(esperado[:maximo]) - set(obtido))
+                print(f"DIVERGE {consulta!r} (máximo {maximo}): {len(obtido)} resultados, {len(esperado[:maximo])} esperados, {faltando} faltando")
+    print(f"{len(consultas)} consultas x {len(LIMITES)} tamanhos de resultado: {divergencias} divergências")
+    print(f"Varredura completa: {tempo_varredura / len(consultas) * 1000:.1f} ms por consulta; "
+          f"índice: {tempo_indice / (len(consultas) * len(LIMITES)) * 1000:.1f} ms por busca")
+    return divergencias
+
+# Uso: python verificar_busca.py [quantidade de títulos] [semente]  (termina com código 1 se a busca divergir da varredura completa)
+if __name__ == "__main__":
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else TITULOS
+    semente = int(sys.argv[2]) if len(sys.argv) > 2 else SEMENTE
+    titulos = gerar_titulos(quantidade, semente)
+    consultas = CONSULTAS + consultas_com_erros(titulos, 30)
+    sys.exit(1 if verificar(titulos, consultas) else 0)